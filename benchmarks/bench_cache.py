@@ -0,0 +1,80 @@
+import argparse
+import sys
+import tempfile
+import time
+from argparse import Namespace
+from pathlib import Path
+
+from requests_cache import CachedSession
+
+from bench_modes import CORPUS, SRC_DIR, corpus_session, load_corpus
+
+REPORT_HEADER = (
+    f'{"формат":<16} {"размер, КиБ":>12} {"запись, c":>10} '
+    f'{"холодное, c":>12} {"тёплое, c":>10}'
+)
+REPORT_PATTERN = (
+    '{name:<16} {kib:>12} {write:>10.3f} {cold:>12.3f} {warm:>10.3f}'
+)
+
+
+def read_all(session, corpus):
+    started = time.perf_counter()
+    for page in corpus:
+        assert session.get(page['url']).from_cache
+    return time.perf_counter() - started
+
+
+def measure(corpus, level):
+    from cache_storage import backend_options, cache_path
+    with tempfile.TemporaryDirectory() as directory:
+        cli_args = Namespace(
+            cache_backend='sqlite',
+            cache_dir=Path(directory),
+            cache_compression=level
+        )
+        _, adapter = corpus_session(corpus)
+        session = CachedSession(
+            cache_path(cli_args), **backend_options(cli_args)
+        )
+        session.mount('https://', adapter)
+        started = time.perf_counter()
+        for page in corpus:
+            session.get(page['url'])
+        write = time.perf_counter() - started
+        session.cache.responses.vacuum()
+        session.close()
+        kib = sum(
+            path.stat().st_size for path in Path(directory).iterdir()
+        ) // 1024
+        session = CachedSession(
+            cache_path(cli_args), **backend_options(cli_args)
+        )
+        cold = read_all(session, corpus)
+        warm = read_all(session, corpus)
+        session.close()
+    return dict(kib=kib, write=write, cold=cold, warm=warm)
+
+
+def main():
+    sys.path.append(str(SRC_DIR))
+    parser = argparse.ArgumentParser(
+        description='Сравнение размера и скорости чтения кеша '
+                    'без сжатия и со сжатием'
+    )
+    parser.add_argument(
+        '--levels', nargs='+', type=int, default=[1, 6, 9]
+    )
+    parser.add_argument('--corpus', type=Path, default=CORPUS)
+    args = parser.parse_args()
+    corpus = load_corpus(args.corpus)
+    print(REPORT_HEADER)
+    for level in [None, *args.levels]:
+        print(REPORT_PATTERN.format(
+            name='pickle' if level is None else f'pickle+zlib-{level}',
+            **measure(corpus, level)
+        ))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,133 @@
+import argparse
+import gzip
+import json
+import sys
+import time
+import tracemalloc
+from argparse import Namespace
+from pathlib import Path
+
+from requests_cache import CachedSession
+from requests_mock import Adapter
+
+BENCHMARKS_DIR = Path(__file__).resolve().parent
+SRC_DIR = BENCHMARKS_DIR.parent / 'src'
+CORPUS = BENCHMARKS_DIR / 'corpus.jsonl.gz'
+BASELINE = BENCHMARKS_DIR / 'baseline.json'
+MODES = ('whats-new', 'latest-versions', 'pep')
+METRICS = ('seconds', 'peak_kib')
+
+REPORT_PATTERN = (
+    '{mode:<16} {seconds:>8.3f} c {pages:>5} стр. '
+    '{pages_per_second:>9.1f} стр./c {peak_kib:>8} КиБ'
+)
+REGRESSION_PATTERN = (
+    '{mode}: {metric} = {value}, базовое значение {baseline} '
+    '(допуск {tolerance:.0%})'
+)
+
+
+def load_corpus(path=CORPUS):
+    with gzip.open(path, 'rt', encoding='utf-8') as file:
+        return [json.loads(line) for line in file]
+
+
+def corpus_session(corpus):
+    adapter = Adapter()
+    for page in corpus:
+        adapter.register_uri(
+            'GET',
+            page['url'],
+            headers=page['headers'],
+            content=page['body'].encode('utf-8'),
+        )
+    session = CachedSession(backend='memory')
+    session.mount('https://', adapter)
+    return session, adapter
+
+
+def run_mode(mode, corpus, cli_args):
+    from main import MODE_TO_FUNCTION
+    session, adapter = corpus_session(corpus)
+    started = time.perf_counter()
+    rows = list(MODE_TO_FUNCTION[mode](session, cli_args))
+    return time.perf_counter() - started, adapter.call_count, rows
+
+
+def measure(mode, corpus, cli_args, repeat):
+    seconds = min(
+        run_mode(mode, corpus, cli_args)[0] for _ in range(repeat)
+    )
+    tracemalloc.start()
+    _, pages, _ = run_mode(mode, corpus, cli_args)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return {
+        'seconds': round(seconds, 4),
+        'pages': pages,
+        'pages_per_second': round(pages / seconds, 1),
+        'peak_kib': peak // 1024,
+    }
+
+
+def find_regressions(results, baseline, tolerance):
+    return [
+        REGRESSION_PATTERN.format(
+            mode=mode,
+            metric=metric,
+            value=metrics[metric],
+            baseline=baseline[mode][metric],
+            tolerance=tolerance
+        )
+        for mode, metrics in results.items() if mode in baseline
+        for metric in METRICS
+        if metrics[metric] > baseline[mode][metric] * (1 + tolerance)
+    ]
+
+
+def configure_argument_parser():
+    parser = argparse.ArgumentParser(
+        description='Бенчмарк режимов парсера на записанном корпусе страниц'
+    )
+    parser.add_argument('--modes', nargs='+', choices=MODES, default=MODES)
+    parser.add_argument('--backend', choices=('soup', 'lxml'), default='soup')
+    parser.add_argument('--workers', type=int, default=1)
+    parser.add_argument('--repeat', type=int, default=5)
+    parser.add_argument('--tolerance', type=float, default=0.5)
+    parser.add_argument('--corpus', type=Path, default=CORPUS)
+    parser.add_argument('--baseline', type=Path, default=BASELINE)
+    parser.add_argument('--update-baseline', action='store_true')
+    return parser
+
+
+def main():
+    sys.path.append(str(SRC_DIR))
+    args = configure_argument_parser().parse_args()
+    corpus = load_corpus(args.corpus)
+    cli_args = Namespace(backend=args.backend, workers=args.workers)
+    results = {
+        mode: measure(mode, corpus, cli_args, args.repeat)
+        for mode in args.modes
+    }
+    for mode, metrics in results.items():
+        print(REPORT_PATTERN.format(mode=mode, **metrics))
+    baselines = (
+        json.loads(args.baseline.read_text(encoding='utf-8'))
+        if args.baseline.exists() else {}
+    )
+    if args.update_baseline:
+        baselines.setdefault(args.backend, {}).update(results)
+        args.baseline.write_text(
+            json.dumps(baselines, indent=2, sort_keys=True) + '\n',
+            encoding='utf-8'
+        )
+        return 0
+    regressions = find_regressions(
+        results, baselines.get(args.backend, {}), args.tolerance
+    )
+    list(map(print, regressions))
+    return 1 if regressions else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,109 @@
+import argparse
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+from requests_cache import CachedSession
+from requests_mock import Adapter
+
+from bench_modes import CORPUS, SRC_DIR, load_corpus
+
+MAIN = SRC_DIR / 'main.py'
+COMMANDS = {
+    'help': ['-h'],
+    'cache-stats': ['cache-stats'],
+    'latest-versions': ['latest-versions'],
+}
+BUDGETS = {
+    'help': 0.25,
+    'cache-stats': 0.4,
+    'latest-versions': 0.6,
+}
+
+REPORT_PATTERN = '{command:<16} {seconds:>8.3f} c (бюджет {budget:.3f} c)'
+OVER_BUDGET_PATTERN = '{command}: {seconds:.3f} c, бюджет {budget:.3f} c'
+FAILED_RUN_PATTERN = (
+    '{command}: код завершения {code}, строк в выводе {lines}'
+)
+
+
+def warm_cache(directory, corpus):
+    sys.path.append(str(SRC_DIR))
+    from constants import MAIN_DOC_URL
+    adapter = Adapter()
+    for page in corpus:
+        if page['url'] == MAIN_DOC_URL:
+            adapter.register_uri(
+                'GET',
+                page['url'],
+                headers=page['headers'],
+                content=page['body'].encode('utf-8'),
+            )
+    session = CachedSession(str(directory / 'http_cache'))
+    session.mount('https://', adapter)
+    session.get(MAIN_DOC_URL)
+
+
+def run_command(command, directory):
+    started = time.perf_counter()
+    completed = subprocess.run(
+        [sys.executable, str(MAIN), *COMMANDS[command]],
+        cwd=directory,
+        stdout=subprocess.PIPE,
+        stderr=subprocess.DEVNULL,
+        text=True,
+    )
+    seconds = time.perf_counter() - started
+    lines = len(completed.stdout.splitlines())
+    if completed.returncode != 0 or lines == 0:
+        raise RuntimeError(FAILED_RUN_PATTERN.format(
+            command=command, code=completed.returncode, lines=lines
+        ))
+    return seconds
+
+
+def configure_argument_parser():
+    parser = argparse.ArgumentParser(
+        description='Бенчмарк времени запуска парсера на прогретом кеше'
+    )
+    parser.add_argument(
+        '--commands', nargs='+', choices=COMMANDS, default=list(COMMANDS)
+    )
+    parser.add_argument('--repeat', type=int, default=10)
+    parser.add_argument('--scale', type=float, default=1.0)
+    parser.add_argument('--corpus', type=Path, default=CORPUS)
+    return parser
+
+
+def main():
+    args = configure_argument_parser().parse_args()
+    over_budget = []
+    with tempfile.TemporaryDirectory() as directory:
+        directory = Path(directory)
+        warm_cache(directory, load_corpus(args.corpus))
+        for command in args.commands:
+            try:
+                seconds = statistics.median(
+                    run_command(command, directory)
+                    for _ in range(args.repeat)
+                )
+            except RuntimeError as error:
+                over_budget.append(str(error))
+                continue
+            budget = BUDGETS[command] * args.scale
+            print(REPORT_PATTERN.format(
+                command=command, seconds=seconds, budget=budget
+            ))
+            if seconds > budget:
+                over_budget.append(OVER_BUDGET_PATTERN.format(
+                    command=command, seconds=seconds, budget=budget
+                ))
+    list(map(print, over_budget))
+    return 1 if over_budget else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,61 @@
+import argparse
+import gzip
+import json
+import sys
+from pathlib import Path
+from urllib.parse import urljoin
+
+import requests
+
+BENCHMARKS_DIR = Path(__file__).resolve().parent
+SRC_DIR = BENCHMARKS_DIR.parent / 'src'
+CORPUS = BENCHMARKS_DIR / 'corpus.jsonl.gz'
+
+
+def corpus_urls(session, sample):
+    from constants import MAIN_DOC_URL, MAIN_PEP_URL
+    from modes import pep_index
+    from utils import get_backend, get_document
+    whats_new_url = urljoin(MAIN_DOC_URL, 'whatsnew/')
+    whats_new_links = get_backend().whats_new_links(
+        get_document(session, whats_new_url)
+    )
+    pep_links = [row_link for row_link, _ in pep_index(session)]
+    step = max(len(pep_links) // sample, 1)
+    return [
+        MAIN_DOC_URL, whats_new_url, MAIN_PEP_URL,
+        *(urljoin(whats_new_url, href) for href in whats_new_links),
+        *pep_links[::step][:sample],
+    ]
+
+
+def record(path, sample):
+    session = requests.Session()
+    with gzip.open(path, 'wt', encoding='utf-8') as file:
+        for url in corpus_urls(session, sample):
+            response = session.get(url)
+            response.encoding = 'utf-8'
+            file.write(json.dumps({
+                'url': url,
+                'headers': {
+                    'Content-Type': response.headers.get(
+                        'Content-Type', 'text/html; charset=utf-8'
+                    )
+                },
+                'body': response.text,
+            }, ensure_ascii=False) + '\n')
+
+
+def main():
+    sys.path.append(str(SRC_DIR))
+    parser = argparse.ArgumentParser(
+        description='Запись корпуса страниц для бенчмарков'
+    )
+    parser.add_argument('--sample', type=int, default=100)
+    parser.add_argument('--corpus', type=Path, default=CORPUS)
+    args = parser.parse_args()
+    record(args.corpus, args.sample)
+
+
+if __name__ == '__main__':
+    main()
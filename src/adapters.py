@@ -0,0 +1,152 @@
+import random
+import time
+from email.utils import parsedate_to_datetime
+from threading import Condition, Lock
+from urllib.parse import urlsplit
+
+from requests import ConnectionError, Timeout
+from requests.exceptions import RetryError
+from requests.adapters import DEFAULT_POOLSIZE, HTTPAdapter
+from urllib3.util.retry import Retry
+
+import metrics
+from constants import (
+    BACKOFF_MAX, CONNECT_TIMEOUT, READ_TIMEOUT, RETRY_STATUSES,
+    THROTTLE_STATUSES, INITIAL_IN_FLIGHT, HEALTHY_LATENCY_FACTOR
+)
+
+
+def backoff_delay(backoff, attempt):
+    return random.uniform(0, min(backoff * 2 ** attempt, BACKOFF_MAX))
+
+
+class JitterRetry(Retry):
+
+    def get_backoff_time(self):
+        return random.uniform(0, super().get_backoff_time())
+
+
+class TimeoutHTTPAdapter(HTTPAdapter):
+
+    def __init__(self, *args, timeout=(CONNECT_TIMEOUT, READ_TIMEOUT),
+                 **kwargs):
+        self.timeout = timeout
+        super().__init__(*args, **kwargs)
+
+    def send(self, request, **kwargs):
+        if kwargs.get('timeout') is None:
+            kwargs['timeout'] = self.timeout
+        return super().send(request, **kwargs)
+
+
+def retry_after_seconds(value):
+    if not value:
+        return 0
+    if value.isdigit():
+        return int(value)
+    try:
+        return max(parsedate_to_datetime(value).timestamp() - time.time(), 0)
+    except (TypeError, ValueError):
+        return 0
+
+
+class HostThrottle:
+
+    def __init__(self, max_in_flight, rate=None):
+        self.condition = Condition()
+        self.max_in_flight = max_in_flight
+        self.limit = float(min(INITIAL_IN_FLIGHT, max_in_flight))
+        self.in_flight = 0
+        self.interval = None if rate is None else 1 / rate
+        self.burst = 0 if rate is None else (max(rate, 1) - 1) / rate
+        self.next_slot = 0
+        self.resume_at = 0
+        self.best_latency = None
+
+    def acquire(self):
+        with self.condition:
+            while self.in_flight >= int(self.limit):
+                self.condition.wait()
+            self.in_flight += 1
+            now = time.monotonic()
+            start = max(now, self.resume_at)
+            if self.interval is not None:
+                start = max(start, self.next_slot - self.burst)
+                self.next_slot = max(self.next_slot, start) + self.interval
+        time.sleep(start - now)
+
+    def release(self, latency, throttled=False, retry_after=0):
+        with self.condition:
+            self.in_flight -= 1
+            if throttled or retry_after:
+                self.limit = max(1.0, self.limit / 2)
+                self.resume_at = max(
+                    self.resume_at, time.monotonic() + retry_after
+                )
+                metrics.increment('throttled')
+            elif latency is not None:
+                if self.best_latency is None or latency < self.best_latency:
+                    self.best_latency = latency
+                if latency <= HEALTHY_LATENCY_FACTOR * self.best_latency:
+                    self.limit = min(
+                        self.max_in_flight, self.limit + 1 / self.limit
+                    )
+            self.condition.notify_all()
+
+
+def was_throttled(response):
+    retries = getattr(response.raw, 'retries', None)
+    statuses = [response.status_code] + [
+        attempt.status for attempt in getattr(retries, 'history', ())
+    ]
+    return any(status in THROTTLE_STATUSES for status in statuses)
+
+
+class ThrottledHTTPAdapter(TimeoutHTTPAdapter):
+
+    def __init__(self, *args, rate=None, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.max_in_flight = kwargs.get('pool_maxsize', DEFAULT_POOLSIZE)
+        self.rate = rate
+        self.throttles = {}
+        self.throttles_lock = Lock()
+
+    def get_throttle(self, url):
+        host = urlsplit(url).netloc
+        with self.throttles_lock:
+            if host not in self.throttles:
+                self.throttles[host] = HostThrottle(
+                    self.max_in_flight, self.rate
+                )
+            return self.throttles[host]
+
+    def send(self, request, **kwargs):
+        throttle = self.get_throttle(request.url)
+        throttle.acquire()
+        started = time.monotonic()
+        latency, throttled, retry_after = None, False, 0
+        try:
+            response = super().send(request, **kwargs)
+            latency = time.monotonic() - started
+            throttled = was_throttled(response)
+            if throttled:
+                retry_after = retry_after_seconds(
+                    response.headers.get('Retry-After')
+                )
+        except (ConnectionError, Timeout, RetryError):
+            throttled = True
+            raise
+        finally:
+            throttle.release(latency, throttled, retry_after)
+        return response
+
+
+def make_retry(retries, backoff):
+    return JitterRetry(
+        total=retries,
+        connect=retries,
+        read=retries,
+        status=retries,
+        backoff_factor=backoff,
+        status_forcelist=RETRY_STATUSES
+    )
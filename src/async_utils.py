@@ -0,0 +1,166 @@
+import asyncio
+from io import BytesIO
+
+import aiohttp
+from requests import ConnectionError, Request, Response
+from requests.structures import CaseInsensitiveDict
+from requests_cache.policy.actions import CacheActions
+from urllib3 import HTTPResponse
+
+from adapters import backoff_delay
+from cache_storage import touch
+from constants import (
+    CACHE_HIT, CACHE_MISS, CACHE_REVALIDATION, DEFAULT_WORKERS, ENCODING,
+    DEFAULT_RETRIES, DEFAULT_BACKOFF, CONNECT_TIMEOUT, READ_TIMEOUT,
+    RETRY_STATUSES
+)
+import metrics
+import snapshots
+from utils import (
+    REQUEST_MESSAGE_ERROR, extract_document, get_cache_key, parse_content,
+    record_cache_usage
+)
+
+
+NOT_MODIFIED = 304
+VALIDATORS = {'ETag': 'If-None-Match', 'Last-Modified': 'If-Modified-Since'}
+
+
+def get_cached_response(session, cache_key):
+    if session.settings.disabled:
+        return None
+    return session.cache.get_response(cache_key)
+
+
+def validation_headers(cached):
+    if cached is None:
+        return {}
+    return {
+        condition: cached.headers[validator]
+        for validator, condition in VALIDATORS.items()
+        if validator in cached.headers
+    }
+
+
+def save_to_cache(
+    session, url, cache_key, status, headers, content, cached=None
+):
+    response = Response()
+    response.url = url
+    response.status_code = status
+    response.headers = CaseInsensitiveDict(headers)
+    response.request = session.prepare_request(Request('GET', url))
+    response.raw = HTTPResponse(
+        body=BytesIO(content),
+        headers=dict(headers),
+        status=status,
+        preload_content=False,
+        request_url=url
+    )
+    response._content = content
+    actions = CacheActions.from_request(
+        cache_key, response.request, session.settings
+    )
+    actions.update_from_response(response)
+    if cached is not None and status == NOT_MODIFIED:
+        response = actions.update_revalidated_response(response, cached)
+    if not actions.skip_write and not session.settings.disabled:
+        session.cache.save_response(response, cache_key, actions.expires)
+    return response
+
+
+async def request_with_retries(client, url, cli_args, headers=None):
+    retries = getattr(cli_args, 'retries', DEFAULT_RETRIES)
+    for attempt in range(retries + 1):
+        try:
+            async with client.get(url, headers=headers) as response:
+                if response.status in RETRY_STATUSES:
+                    response.raise_for_status()
+                return (
+                    response.status, response.headers, await response.read()
+                )
+        except (aiohttp.ClientError, asyncio.TimeoutError):
+            if attempt == retries:
+                raise
+        await asyncio.sleep(backoff_delay(
+            getattr(cli_args, 'backoff', DEFAULT_BACKOFF), attempt
+        ))
+
+
+async def get_content_async(client, session, url, semaphore, cli_args=None):
+    cache_key = get_cache_key(session, url)
+    cached = get_cached_response(session, cache_key)
+    if cached is not None and not cached.is_expired:
+        record_cache_usage(CACHE_HIT, cache_key)
+        touch(session, cache_key)
+        snapshots.record(
+            url, cached.status_code, cached.headers, cached.content
+        )
+        return cached.content
+    async with semaphore:
+        try:
+            with metrics.timer('network'):
+                status, headers, content = await request_with_retries(
+                    client, url, cli_args, validation_headers(cached)
+                )
+        except (aiohttp.ClientError, asyncio.TimeoutError) as error:
+            raise ConnectionError(
+                REQUEST_MESSAGE_ERROR.format(url=url, error=error)
+            )
+    metrics.increment('bytes', len(content))
+    if cached is not None and status == NOT_MODIFIED:
+        record_cache_usage(CACHE_REVALIDATION, cache_key)
+        touch(session, cache_key)
+        cached = save_to_cache(
+            session, url, cache_key, status, headers, content, cached
+        )
+        snapshots.record(
+            url, cached.status_code, cached.headers, cached.content
+        )
+        return cached.content
+    record_cache_usage(CACHE_MISS, cache_key)
+    snapshots.record(url, status, headers, content)
+    save_to_cache(session, url, cache_key, status, headers, content)
+    touch(session, cache_key)
+    return content
+
+
+async def fetch_record_async(
+    client, session, url, extract, semaphore, cli_args, scope
+):
+    try:
+        content = await get_content_async(
+            client, session, url, semaphore, cli_args
+        )
+    except ConnectionError as error:
+        return None, error
+    return extract_document(
+        parse_content(content, ENCODING, cli_args, scope), extract, cli_args
+    ), None
+
+
+async def gather_records(session, urls, extract, cli_args, scope):
+    semaphore = asyncio.Semaphore(
+        getattr(cli_args, 'workers', DEFAULT_WORKERS)
+    )
+    async with aiohttp.ClientSession(
+        connector=aiohttp.TCPConnector(
+            limit_per_host=getattr(cli_args, 'pool_size', None) or 0
+        ),
+        timeout=aiohttp.ClientTimeout(
+            sock_connect=getattr(cli_args, 'connect_timeout', CONNECT_TIMEOUT),
+            sock_read=getattr(cli_args, 'read_timeout', READ_TIMEOUT)
+        )
+    ) as client:
+        return await asyncio.gather(*(
+            fetch_record_async(
+                client, session, url, extract, semaphore, cli_args, scope
+            )
+            for url in urls
+        ))
+
+
+def crawl_async(session, urls, extract, cli_args=None, scope=None):
+    return asyncio.run(
+        gather_records(session, urls, extract, cli_args, scope)
+    )
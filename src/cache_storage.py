@@ -0,0 +1,179 @@
+import pickle
+import time
+import zlib
+from datetime import datetime, timezone
+from functools import partial
+from threading import Lock
+
+from requests_cache.backends import FileDict, SQLiteDict
+from requests_cache.serializers import CattrStage, SerializerPipeline, Stage
+
+from constants import (
+    CACHE_ACCESS_TABLE, CACHE_NAME, MEMORY_CACHE, SQLITE_CACHE
+)
+
+
+DECODE_ERRORS = (
+    zlib.error, pickle.UnpicklingError, AttributeError, EOFError, KeyError,
+    TypeError, ValueError
+)
+UNDECODED_CREATED_AT = datetime.min.replace(tzinfo=timezone.utc)
+ACCESS_LOCK = Lock()
+
+
+def cache_path(cli_args):
+    cache_dir = getattr(cli_args, 'cache_dir', None)
+    return CACHE_NAME if cache_dir is None else str(cache_dir / CACHE_NAME)
+
+
+def compressed_serializer(level):
+    return SerializerPipeline(
+        [
+            CattrStage(),
+            Stage(pickle),
+            Stage(
+                dumps=partial(zlib.compress, level=level),
+                loads=zlib.decompress
+            ),
+        ],
+        name=f'pickle-zlib-{level}',
+        is_binary=True
+    )
+
+
+def backend_options(cli_args):
+    backend = getattr(cli_args, 'cache_backend', SQLITE_CACHE)
+    options = dict(backend=backend)
+    if backend == SQLITE_CACHE:
+        options['wal'] = True
+    level = getattr(cli_args, 'cache_compression', None)
+    if level is not None and backend != MEMORY_CACHE:
+        options['serializer'] = compressed_serializer(level)
+    return options
+
+
+def stored_sizes(responses):
+    if isinstance(responses, SQLiteDict):
+        with responses.connection() as connection:
+            return dict(connection.execute(
+                f'SELECT key, length(value) FROM {responses.table_name}'
+            ))
+    if isinstance(responses, FileDict):
+        return {path.stem: path.stat().st_size for path in responses.paths()}
+    return None
+
+
+def access_times(cache):
+    with ACCESS_LOCK:
+        accessed = getattr(cache, 'accessed', None)
+        if accessed is not None:
+            return accessed
+        responses = cache.responses
+        if isinstance(responses, SQLiteDict):
+            accessed = SQLiteDict(
+                responses.db_path, CACHE_ACCESS_TABLE, serializer=None
+            )
+        elif isinstance(responses, FileDict):
+            accessed = SQLiteDict(
+                responses.cache_dir / f'{CACHE_ACCESS_TABLE}.sqlite',
+                CACHE_ACCESS_TABLE,
+                serializer=None
+            )
+        else:
+            accessed = {}
+        cache.accessed = accessed
+        return accessed
+
+
+def touch(session, cache_key):
+    if (
+        cache_key is None or getattr(session, 'cache', None) is None
+        or session.settings.disabled
+    ):
+        return
+    access_times(session.cache)[cache_key] = time.time()
+
+
+def cache_entries(session):
+    responses = session.cache.responses
+    sizes = stored_sizes(responses)
+    entries = []
+    for key in list(responses.keys()):
+        try:
+            response = responses[key]
+        except DECODE_ERRORS:
+            response = None
+        if response is None:
+            entries.append((key, (sizes or {}).get(key, 0), None, True))
+            continue
+        entries.append((
+            key,
+            len(response.content) if sizes is None else sizes.get(key, 0),
+            response.created_at,
+            response.is_expired
+        ))
+    return entries
+
+
+def last_used(entry, accessed):
+    created_at = (
+        UNDECODED_CREATED_AT if entry[2] is None else as_utc(entry[2])
+    )
+    return max(accessed.get(entry[0], 0), created_at.timestamp())
+
+
+def eviction_order(entries, recent_keys=(), accessed=None):
+    recent_keys = set(recent_keys)
+    accessed = accessed or {}
+    return sorted(
+        entries,
+        key=lambda entry: (
+            entry[0] in recent_keys, last_used(entry, accessed)
+        )
+    )
+
+
+def as_utc(moment):
+    if moment.tzinfo is None:
+        return moment.replace(tzinfo=timezone.utc)
+    return moment
+
+
+def prune_cache(session, max_size=None, recent_keys=(), expired=False):
+    entries = cache_entries(session)
+    accessed = access_times(session.cache)
+    accessed_at = dict(accessed.items())
+    evicted = [entry for entry in entries if expired and entry[3]]
+    if max_size is not None:
+        kept = [entry for entry in entries if entry not in evicted]
+        excess = sum(size for _, size, _, _ in kept) - max_size
+        for entry in eviction_order(kept, recent_keys, accessed_at):
+            if excess <= 0:
+                break
+            evicted.append(entry)
+            excess -= entry[1]
+    evicted_keys = {key for key, _, _, _ in evicted}
+    kept_keys = {key for key, _, _, _ in entries} - evicted_keys
+    for key in [key for key in accessed if key not in kept_keys]:
+        del accessed[key]
+    if evicted:
+        session.cache.delete(*evicted_keys)
+        vacuum = getattr(session.cache.responses, 'vacuum', None)
+        if vacuum is not None:
+            vacuum()
+    return len(evicted), sum(size for _, size, _, _ in evicted)
+
+
+def cache_summary(session):
+    entries = cache_entries(session)
+    created = [
+        as_utc(created_at) for _, _, created_at, _ in entries
+        if created_at is not None
+    ]
+    return dict(
+        entries=len(entries),
+        size=sum(size for _, size, _, _ in entries),
+        expired=sum(expired for _, _, _, expired in entries),
+        oldest=min(created, default=None),
+        newest=max(created, default=None)
+    )
@@ -0,0 +1,91 @@
+import logging
+from argparse import Namespace
+
+from constants import MEGABYTE, SQLITE_CACHE, DT_FORMAT, WATCH_INTERVAL
+
+
+NO_SHARDS_MESSAGE = 'В каталоге {shard_dir} нет частичных результатов'
+CACHE_PRUNE_MESSAGE = 'Из кеша удалено страниц: {count}, освобождено {size}'
+UNKNOWN_WATCH_MODE_MESSAGE = 'Режим {mode} нельзя обновлять в watch'
+
+
+def format_size(size):
+    return f'{size / MEGABYTE:.2f} МБ'
+
+
+def cache_stats(session, cli_args=None):
+    from cache_storage import cache_path, cache_summary
+    summary = cache_summary(session)
+    yield ('Показатель', 'Значение')
+    yield ('Хранилище', getattr(cli_args, 'cache_backend', SQLITE_CACHE))
+    yield ('Расположение', cache_path(cli_args))
+    yield ('Страниц', summary['entries'])
+    yield ('Устаревших', summary['expired'])
+    yield ('Размер', format_size(summary['size']))
+    for name, moment in (
+        ('Самая старая запись', summary['oldest']),
+        ('Самая новая запись', summary['newest'])
+    ):
+        yield (name, '' if moment is None else moment.astimezone().strftime(
+            DT_FORMAT
+        ))
+
+
+def prune(session, cli_args=None, recent_keys=(), expired=False):
+    from cache_storage import prune_cache
+    max_size = getattr(cli_args, 'cache_max_size', None)
+    count, size = prune_cache(
+        session,
+        None if max_size is None else max_size * MEGABYTE,
+        recent_keys,
+        expired
+    )
+    logging.info(
+        CACHE_PRUNE_MESSAGE.format(count=count, size=format_size(size))
+    )
+
+
+def cache_prune(session, cli_args=None):
+    prune(session, cli_args, expired=True)
+
+
+def merge(session, cli_args=None):
+    import shards
+    from outputs import control_output
+    merged = False
+    for mode, merge_parts in shards.MERGE_FUNCTIONS.items():
+        parts = shards.load(cli_args, mode)
+        if parts:
+            merged = True
+            control_output(
+                merge_parts(parts),
+                Namespace(**{**vars(cli_args), 'mode': mode})
+            )
+    if not merged:
+        logging.info(NO_SHARDS_MESSAGE.format(
+            shard_dir=shards.shard_dir(cli_args)
+        ))
+
+
+def serve(session, cli_args=None):
+    import server
+    from modes import SERVED_MODES
+    server.serve(
+        server.ResultStore(session, cli_args, SERVED_MODES, cli_args.ttl),
+        cli_args.host,
+        cli_args.port
+    )
+
+
+def watch(session, cli_args=None):
+    import scheduler
+    from modes import MODE_FUNCTIONS, SERVED_MODES
+    intervals = dict(cli_args.interval) or dict.fromkeys(
+        getattr(cli_args, 'watch_modes', None) or SERVED_MODES, WATCH_INTERVAL
+    )
+    for mode in intervals:
+        if mode not in MODE_FUNCTIONS:
+            raise ValueError(UNKNOWN_WATCH_MODE_MESSAGE.format(mode=mode))
+    scheduler.Scheduler(
+        session, cli_args, MODE_FUNCTIONS, intervals, cli_args.jitter
+    ).run_forever()
@@ -1,16 +1,58 @@
 import argparse
 import logging
 from logging.handlers import RotatingFileHandler
+from pathlib import Path
 
 from constants import (
-    BASE_DIR, LOG, LOG_FILE, LOG_FORMAT, DT_FORMAT, PRETTY, FILE
+    BASE_DIR, LOG, LOG_FILE, LOG_FORMAT, DT_FORMAT, PRETTY, FILE, SQLITE,
+    JSONL, DEFAULT_WORKERS, THREADS_ENGINE, ASYNC_ENGINE, DEFAULT_SEGMENTS,
+    SOUP_BACKEND, LXML_BACKEND, CACHE_EXPIRE_AFTER, PEP_STATE_MAX_AGE,
+    DEFAULT_RETRIES, DEFAULT_BACKOFF, CONNECT_TIMEOUT, READ_TIMEOUT,
+    SQLITE_CACHE, FILESYSTEM_CACHE, MEMORY_CACHE, DEFAULT_HOST, DEFAULT_PORT,
+    RESULTS_TTL, WATCH_JITTER
 )
 
 
+EXPIRE_FORMAT_ERROR = 'Ожидается ШАБЛОН=СЕКУНДЫ, получено: {value}'
+INTERVAL_FORMAT_ERROR = 'Ожидается РЕЖИМ=СЕКУНДЫ, получено: {value}'
+SHARD_FORMAT_ERROR = 'Ожидается НОМЕР/ЧАСТЕЙ, получено: {value}'
+
+
+def url_expiration(value):
+    pattern, _, seconds = value.rpartition('=')
+    if not pattern or not seconds.isdigit():
+        raise argparse.ArgumentTypeError(
+            EXPIRE_FORMAT_ERROR.format(value=value)
+        )
+    return pattern, int(seconds)
+
+
+def mode_interval(value):
+    mode, _, seconds = value.rpartition('=')
+    if not mode or not seconds.isdigit() or int(seconds) == 0:
+        raise argparse.ArgumentTypeError(
+            INTERVAL_FORMAT_ERROR.format(value=value)
+        )
+    return mode, int(seconds)
+
+
+def shard_spec(value):
+    index, _, count = value.partition('/')
+    if (
+        not index.isdigit() or not count.isdigit()
+        or not 1 <= int(index) <= int(count)
+    ):
+        raise argparse.ArgumentTypeError(
+            SHARD_FORMAT_ERROR.format(value=value)
+        )
+    return int(index), int(count)
+
+
 def configure_argument_parser(available_modes):
     parser = argparse.ArgumentParser(description='Парсер документации Python')
     parser.add_argument(
         'mode',
+        nargs='+',
         choices=available_modes,
         help='Режимы работы парсера'
     )
@@ -23,9 +65,203 @@ def configure_argument_parser(available_modes):
     parser.add_argument(
         '-o',
         '--output',
-        choices=(PRETTY, FILE),
+        choices=(PRETTY, FILE, SQLITE, JSONL),
         help='Дополнительные способы вывода данных'
     )
+    parser.add_argument(
+        '-w',
+        '--workers',
+        type=int,
+        default=DEFAULT_WORKERS,
+        help='Количество потоков загрузки страниц'
+    )
+    parser.add_argument(
+        '-e',
+        '--engine',
+        choices=(THREADS_ENGINE, ASYNC_ENGINE),
+        default=THREADS_ENGINE,
+        help='Способ параллельной загрузки страниц'
+    )
+    parser.add_argument(
+        '-p',
+        '--parse-processes',
+        type=int,
+        default=0,
+        help='Количество процессов для разбора загруженных страниц'
+    )
+    parser.add_argument(
+        '-b',
+        '--backend',
+        choices=(SOUP_BACKEND, LXML_BACKEND),
+        default=SOUP_BACKEND,
+        help='Библиотека для извлечения данных со страниц'
+    )
+    parser.add_argument(
+        '--decode-text',
+        action='store_true',
+        help='Декодирование страниц в строку перед разбором'
+    )
+    parser.add_argument(
+        '--cache-backend',
+        choices=(SQLITE_CACHE, FILESYSTEM_CACHE, MEMORY_CACHE),
+        default=SQLITE_CACHE,
+        help='Хранилище кеша страниц'
+    )
+    parser.add_argument(
+        '--cache-dir',
+        type=Path,
+        help='Каталог для хранения кеша страниц'
+    )
+    parser.add_argument(
+        '--cache-max-size',
+        type=float,
+        help='Наибольший размер кеша в мегабайтах; давно не использованные '
+             'страницы удаляются после работы'
+    )
+    parser.add_argument(
+        '--cache-compression',
+        type=int,
+        choices=range(1, 10),
+        metavar='LEVEL',
+        help='Сжатие страниц в кеше (zlib) с уровнем от 1 до 9'
+    )
+    parser.add_argument(
+        '--expire',
+        type=url_expiration,
+        action='append',
+        default=[],
+        metavar='PATTERN=SECONDS',
+        help='Срок хранения страниц в кеше для шаблона ссылок'
+    )
+    parser.add_argument(
+        '-i',
+        '--incremental',
+        action='store_true',
+        help='Загрузка только изменившихся карточек PEP'
+    )
+    parser.add_argument(
+        '--max-age',
+        type=int,
+        default=PEP_STATE_MAX_AGE,
+        help='Через сколько секунд карточка PEP загружается заново'
+    )
+    parser.add_argument(
+        '--stream-cards',
+        action='store_true',
+        help='Загрузка и разбор карточек PEP только до списка полей '
+             'в заголовке'
+    )
+    parser.add_argument(
+        '-s',
+        '--segments',
+        type=int,
+        default=DEFAULT_SEGMENTS,
+        help='Количество параллельно загружаемых частей архива'
+    )
+    parser.add_argument(
+        '-a',
+        '--all-formats',
+        action='store_true',
+        help='Загрузка архивов документации во всех форматах'
+    )
+    parser.add_argument(
+        '--pool-size',
+        type=int,
+        help='Количество соединений, сохраняемых для повторного '
+             'использования с одним сайтом'
+    )
+    parser.add_argument(
+        '--retries',
+        type=int,
+        default=DEFAULT_RETRIES,
+        help='Количество повторов запроса при сбое соединения, '
+             'ответах 429 и 5xx'
+    )
+    parser.add_argument(
+        '--backoff',
+        type=float,
+        default=DEFAULT_BACKOFF,
+        help='Базовая пауза в секундах между повторами запроса'
+    )
+    parser.add_argument(
+        '--rate-limit',
+        type=float,
+        help='Наибольшее число запросов в секунду к одному сайту'
+    )
+    parser.add_argument(
+        '--connect-timeout',
+        type=float,
+        default=CONNECT_TIMEOUT,
+        help='Время ожидания соединения с сайтом в секундах'
+    )
+    parser.add_argument(
+        '--read-timeout',
+        type=float,
+        default=READ_TIMEOUT,
+        help='Время ожидания ответа сайта в секундах'
+    )
+    parser.add_argument(
+        '--host',
+        default=DEFAULT_HOST,
+        help='Адрес, на котором режим serve принимает запросы'
+    )
+    parser.add_argument(
+        '--port',
+        type=int,
+        default=DEFAULT_PORT,
+        help='Порт, на котором режим serve принимает запросы'
+    )
+    parser.add_argument(
+        '--ttl',
+        type=float,
+        default=RESULTS_TTL,
+        help='Через сколько секунд режим serve обновляет результаты режимов'
+    )
+    parser.add_argument(
+        '--interval',
+        type=mode_interval,
+        action='append',
+        default=[],
+        metavar='MODE=SECONDS',
+        help='Режим, который обновляет watch, и период его обновления'
+    )
+    parser.add_argument(
+        '--jitter',
+        type=float,
+        default=WATCH_JITTER,
+        help='Случайный разброс периода обновления в режиме watch (доля)'
+    )
+    parser.add_argument(
+        '--shard',
+        type=shard_spec,
+        metavar='I/N',
+        help='Режимы whats-new и pep обрабатывают только I-ю из N частей '
+             'ссылок и сохраняют частичный результат для команды merge'
+    )
+    parser.add_argument(
+        '--shard-dir',
+        type=Path,
+        help='Каталог частичных результатов (по умолчанию results/shards)'
+    )
+    parser.add_argument(
+        '--record',
+        type=Path,
+        metavar='DIR',
+        help='Каталог, в снимок которого дописываются все загруженные '
+             'страницы с заголовками'
+    )
+    parser.add_argument(
+        '--replay',
+        type=Path,
+        metavar='DIR',
+        help='Каталог со снимком, из которого берутся страницы '
+             'вместо загрузки из сети'
+    )
+    parser.add_argument(
+        '--metrics-dir',
+        type=Path,
+        help='Каталог для сводки времени по этапам (JSON и Prometheus)'
+    )
     return parser
 
 
@@ -42,3 +278,35 @@ def configure_logging():
         level=logging.INFO,
         handlers=(rotating_handler, logging.StreamHandler())
     )
+
+
+def configure_session(cli_args):
+    import requests_cache
+    from requests.adapters import DEFAULT_POOLSIZE
+
+    from adapters import ThrottledHTTPAdapter, make_retry
+    from cache_storage import backend_options, cache_path
+    urls_expire_after = dict(cli_args.expire)
+    for pattern, seconds in CACHE_EXPIRE_AFTER.items():
+        urls_expire_after.setdefault(pattern, seconds)
+    session = requests_cache.CachedSession(
+        cache_path(cli_args),
+        urls_expire_after=urls_expire_after,
+        **backend_options(cli_args)
+    )
+    if cli_args.replay is not None:
+        from snapshots import ReplayAdapter, SnapshotReader
+        session.settings.disabled = True
+        adapter = ReplayAdapter(SnapshotReader(cli_args.replay))
+    else:
+        adapter = ThrottledHTTPAdapter(
+            pool_maxsize=cli_args.pool_size or max(
+                cli_args.workers, cli_args.segments, DEFAULT_POOLSIZE
+            ),
+            max_retries=make_retry(cli_args.retries, cli_args.backoff),
+            timeout=(cli_args.connect_timeout, cli_args.read_timeout),
+            rate=cli_args.rate_limit
+        )
+    session.mount('http://', adapter)
+    session.mount('https://', adapter)
+    return session
@@ -15,8 +15,55 @@ RESULT = 'results'
 DOWNLOAD = 'downloads'
 LOG = 'logs'
 LOG_FILE = 'parser.log'
+STATE = 'state'
+PEP_STATE_FILE = 'pep.json'
+PEP_STATE_MAX_AGE = 7 * 24 * 60 * 60
 PRETTY = 'pretty'
 FILE = 'file'
+SQLITE = 'sqlite'
+JSONL = 'jsonl'
+SQLITE_FILE = 'results.sqlite3'
+SQLITE_BATCH_SIZE = 500
+ALL_MODES = 'all'
+SERVE_MODE = 'serve'
+DEFAULT_HOST = '127.0.0.1'
+DEFAULT_PORT = 8080
+RESULTS_TTL = 10 * 60
+WATCH_MODE = 'watch'
+WATCH_INTERVAL = 60 * 60
+WATCH_JITTER = 0.1
+PAGE_MEMO_SIZE = 32
+MERGE_MODE = 'merge'
+SHARDS_DIR = 'shards'
+SHARD_FILE = '{mode}_{index}-of-{count}.json'
+SHARD_GLOB = '{mode}_*-of-*.json'
+SNAPSHOT_DATA = 'pages.bin'
+SNAPSHOT_INDEX = 'index.jsonl'
+METRICS_JSON = 'metrics.json'
+METRICS_PROM = 'metrics.prom'
+
+DEFAULT_WORKERS = 1
+ENCODING = 'utf-8'
+THREADS_ENGINE = 'threads'
+ASYNC_ENGINE = 'async'
+SOUP_BACKEND = 'soup'
+LXML_BACKEND = 'lxml'
+DOWNLOAD_CHUNK_SIZE = 64 * 1024
+STREAM_CHUNK_SIZE = 8 * 1024
+DEFAULT_SEGMENTS = 1
+DEFAULT_RETRIES = 3
+DEFAULT_BACKOFF = 0.5
+BACKOFF_MAX = 120
+CONNECT_TIMEOUT = 5
+READ_TIMEOUT = 30
+RETRY_STATUSES = (429, 500, 502, 503, 504)
+THROTTLE_STATUSES = (429, 503)
+INITIAL_IN_FLIGHT = 2
+HEALTHY_LATENCY_FACTOR = 3
+PART_SUFFIX = '.part'
+VALIDATOR_SUFFIX = '.validator'
+PDF_A4_ARCHIVE_PATTERN = r'.+pdf-a4\.zip$'
+ALL_ARCHIVES_PATTERN = r'.+\.(zip|tar\.bz2|epub)$'
 
 EXPECTED_STATUS = {
     'A': ('Active', 'Accepted'),
@@ -28,3 +75,32 @@ EXPECTED_STATUS = {
     'W': ('Withdrawn',),
     '': ('Draft', 'Active'),
 }
+WHATS_NEW_HEADER = ('Ссылка на статью', 'Заголовок', 'Редактор, Автор')
+PEP_HEADER = ('Статус', 'Количество')
+PEP_TOTAL = 'Всего'
+
+WHATS_NEW_INDEX_SCOPE = ('section', {'id': 'what-s-new-in-python'})
+WHATS_NEW_SCOPE = (('h1', 'dl'), None)
+LATEST_VERSIONS_SCOPE = ('div', {'class': 'sphinxsidebarwrapper'})
+DOWNLOAD_SCOPE = ('table', None)
+PEP_INDEX_SCOPE = ('section', {'id': 'numerical-index'})
+PEP_CARD_SCOPE = ('dl', {'class': 'rfc2822 field-list simple'})
+
+CACHE_NAME = 'http_cache'
+SQLITE_CACHE = 'sqlite'
+FILESYSTEM_CACHE = 'filesystem'
+MEMORY_CACHE = 'memory'
+MEGABYTE = 1024 * 1024
+CACHE_STATS_MODE = 'cache-stats'
+CACHE_PRUNE_MODE = 'cache-prune'
+CACHE_ACCESS_TABLE = 'accessed'
+
+CACHE_HIT = 'hits'
+CACHE_MISS = 'misses'
+CACHE_REVALIDATION = 'revalidations'
+CACHE_EXPIRE_AFTER = {
+    'peps.python.org/pep-': 7 * 24 * 60 * 60,
+    'docs.python.org/3/whatsnew/*.html': 7 * 24 * 60 * 60,
+    'peps.python.org/': 60 * 60,
+    'docs.python.org/': 24 * 60 * 60,
+}
@@ -0,0 +1,95 @@
+from lxml import etree, html
+
+from exceptions import ParserFindTagException
+from utils import FIND_TAG_MESSAGE_ERROR
+
+
+def has_class(name):
+    return f'contains(concat(" ", normalize-space(@class), " "), " {name} ")'
+
+
+WHATS_NEW_LINKS = etree.XPath(
+    '//*[@id="what-s-new-in-python"]'
+    f'//div[{has_class("toctree-wrapper")}]'
+    f'//li[{has_class("toctree-l1")}]'
+    '//a[contains(., "What’s New")]'
+)
+FIRST_H1 = etree.XPath('(//h1)[1]')
+FIRST_DL = etree.XPath('(//dl)[1]')
+SIDEBAR_LISTS = etree.XPath(f'//div[{has_class("sphinxsidebarwrapper")}]/ul')
+LINKS = etree.XPath('.//a')
+FIRST_TABLE = etree.XPath('(//table)[1]')
+LINKS_WITH_HREF = etree.XPath('.//a[@href]')
+PEP_INDEX_ROWS = etree.XPath('//*[@id="numerical-index"]//tr')
+PEP_ROW_LINK = etree.XPath('(.//a[@class="pep reference internal"])[1]')
+PEP_ROW_ABBR = etree.XPath('(.//abbr)[1]')
+PEP_FIELD_LIST = etree.XPath('(//dl[@class="rfc2822 field-list simple"])[1]')
+
+
+def find(node, xpath, tag, attrs=None):
+    found = xpath(node)
+    if not found:
+        raise ParserFindTagException(
+            FIND_TAG_MESSAGE_ERROR.format(tag=tag, attrs=attrs)
+        )
+    return found[0]
+
+
+def parse(markup, scope=None, encoding=None):
+    # lxml builds the whole tree faster than a scoped BeautifulSoup parse,
+    # and every query below is anchored, so the scope is not needed here.
+    return html.document_fromstring(
+        markup,
+        parser=None if encoding is None else html.HTMLParser(
+            encoding=encoding
+        )
+    )
+
+
+def whats_new_links(document):
+    return [a_tag.get('href') for a_tag in WHATS_NEW_LINKS(document)]
+
+
+def whats_new_record(document):
+    return (
+        str(find(document, FIRST_H1, 'h1').text_content()),
+        str(find(document, FIRST_DL, 'dl').text_content()).replace('\n', ' ')
+    )
+
+
+def version_links(document):
+    for ul in SIDEBAR_LISTS(document):
+        if 'All versions' in ul.text_content():
+            return [
+                (tag.get('href'), tag.text_content()) for tag in LINKS(ul)
+            ]
+    return None
+
+
+def archive_links(document):
+    return [
+        a_tag.get('href')
+        for a_tag in LINKS_WITH_HREF(find(document, FIRST_TABLE, 'table'))
+    ]
+
+
+def pep_rows(document):
+    return [
+        (
+            find(
+                row, PEP_ROW_LINK, 'a', {'class': 'pep reference internal'}
+            ).get('href'),
+            find(row, PEP_ROW_ABBR, 'abbr').text_content()
+        )
+        for row in PEP_INDEX_ROWS(document)[1:]
+    ]
+
+
+def pep_status(document):
+    pep_title = find(
+        document, PEP_FIELD_LIST, 'dl',
+        {'class': 'rfc2822 field-list simple'}
+    )
+    for tag in pep_title.iterchildren('dt'):
+        if tag.text_content() == 'Status:':
+            return str(tag.getnext().text_content())
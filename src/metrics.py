@@ -0,0 +1,159 @@
+import json
+import time
+from collections import defaultdict
+from contextlib import contextmanager
+from threading import Lock
+
+from constants import METRICS_JSON, METRICS_PROM, PART_SUFFIX
+
+
+SAMPLES = defaultdict(list)
+COUNTERS = defaultdict(int)
+LOCK = Lock()
+CURRENT_MODE = {'mode': None}
+
+QUANTILES = {'p50': 0.5, 'p95': 0.95}
+PROM_PREFIX = 'bs4_parser'
+
+
+def set_mode(mode):
+    CURRENT_MODE['mode'] = mode
+
+
+def observe(phase, seconds):
+    with LOCK:
+        SAMPLES[CURRENT_MODE['mode'], phase].append(seconds)
+
+
+def increment(name, value=1):
+    with LOCK:
+        COUNTERS[CURRENT_MODE['mode'], name] += value
+
+
+@contextmanager
+def timer(phase):
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        observe(phase, time.perf_counter() - started)
+
+
+def reset():
+    with LOCK:
+        SAMPLES.clear()
+        COUNTERS.clear()
+
+
+def drain():
+    with LOCK:
+        samples = [
+            (phase, seconds)
+            for (_, phase), values in SAMPLES.items() for seconds in values
+        ]
+        SAMPLES.clear()
+    return samples
+
+
+def merge(samples):
+    for phase, seconds in samples:
+        observe(phase, seconds)
+
+
+def timed_iteration(iterable, spent):
+    iterator = iter(iterable)
+    while True:
+        started = time.perf_counter()
+        try:
+            item = next(iterator)
+        except StopIteration:
+            return
+        finally:
+            spent.append(time.perf_counter() - started)
+        yield item
+
+
+def quantile(values, share):
+    return values[min(int(share * len(values)), len(values) - 1)]
+
+
+def summarize():
+    summary = defaultdict(lambda: {'phases': {}, 'counters': {}})
+    with LOCK:
+        for (mode, phase), values in SAMPLES.items():
+            values = sorted(values)
+            summary[mode]['phases'][phase] = {
+                'count': len(values),
+                'sum': sum(values),
+                **{
+                    key: quantile(values, share)
+                    for key, share in QUANTILES.items()
+                },
+                'max': values[-1],
+            }
+        for (mode, name), value in COUNTERS.items():
+            summary[mode]['counters'][name] = value
+    return dict(summary)
+
+
+def prometheus_family(name, kind, help_text, samples):
+    return [
+        f'# HELP {PROM_PREFIX}_{name} {help_text}',
+        f'# TYPE {PROM_PREFIX}_{name} {kind}',
+        *(
+            f'{PROM_PREFIX}_{name}{suffix}{{{labels}}} {value}'
+            for suffix, labels, value in samples
+        ),
+    ]
+
+
+def to_prometheus(summary):
+    phases = [
+        (f'mode="{mode}",phase="{phase}"', stats)
+        for mode, data in summary.items()
+        for phase, stats in data['phases'].items()
+    ]
+    counters = sorted({
+        name for data in summary.values() for name in data['counters']
+    })
+    lines = prometheus_family(
+        'phase_seconds', 'summary', 'Time spent in a phase of a run.',
+        [
+            ('', f'{labels},quantile="{share}"', stats[key])
+            for labels, stats in phases
+            for key, share in QUANTILES.items()
+        ] + [
+            (f'_{key}', labels, stats[key])
+            for labels, stats in phases for key in ('sum', 'count')
+        ]
+    ) + prometheus_family(
+        'phase_max_seconds', 'gauge', 'Slowest call of a phase in a run.',
+        [('', labels, stats['max']) for labels, stats in phases]
+    )
+    for name in counters:
+        lines += prometheus_family(
+            f'{name}_total', 'counter', f'Run total of {name}.',
+            [
+                ('', f'mode="{mode}"', data['counters'][name])
+                for mode, data in summary.items()
+                if name in data['counters']
+            ]
+        )
+    return '\n'.join(lines) + '\n'
+
+
+def write_atomically(path, text):
+    part_path = path.with_name(path.name + PART_SUFFIX)
+    part_path.write_text(text, encoding='utf-8')
+    part_path.replace(path)
+
+
+def export(metrics_dir):
+    metrics_dir.mkdir(parents=True, exist_ok=True)
+    summary = summarize()
+    write_atomically(
+        metrics_dir / METRICS_JSON,
+        json.dumps(summary, ensure_ascii=False, indent=2)
+    )
+    write_atomically(metrics_dir / METRICS_PROM, to_prometheus(summary))
+    return summary
@@ -0,0 +1,245 @@
+import re
+import logging
+import time
+from collections import defaultdict
+from operator import itemgetter
+from urllib.parse import urljoin
+
+from tqdm import tqdm
+
+import shards
+from constants import (
+    BASE_DIR, MAIN_DOC_URL, MAIN_PEP_URL, EXPECTED_STATUS, DOWNLOAD,
+    DEFAULT_SEGMENTS, WHATS_NEW_INDEX_SCOPE, WHATS_NEW_SCOPE,
+    LATEST_VERSIONS_SCOPE, DOWNLOAD_SCOPE, PEP_INDEX_SCOPE, PEP_CARD_SCOPE,
+    PDF_A4_ARCHIVE_PATTERN, ALL_ARCHIVES_PATTERN, STATE, PEP_STATE_FILE,
+    PEP_STATE_MAX_AGE, WHATS_NEW_HEADER, PEP_HEADER, PEP_TOTAL
+)
+from exceptions import ParserFindTagException
+from utils import (
+    FIND_TAG_MESSAGE_ERROR, cached_fingerprint, crawl, get_backend,
+    get_document, load_state, save_state, segmented_download
+)
+
+
+EMPTY_RESULT_MESSAGE = 'Ничего не нашлось'
+LOADING_COMPLETE_MESSAGE = 'Архив был загружен и сохранён: {archive_path}'
+SOUP_ERROR_MESSAGE = 'Не удалось создать "суп" ссылки: {url}: {error}'
+SHARD_SAVED_MESSAGE = 'Частичный результат сохранён: {path}'
+WRONG_STATUSES_MESSAGE = (
+    'Несовпадающие статусы: {row_link}. '
+    'Статус в карточке:{pep_status}. '
+    'Ожидаемые статусы:{expect_status}.'
+)
+
+
+def whats_new(session, cli_args=None):
+    logs = []
+    partial = []
+    shard = getattr(cli_args, 'shard', None)
+    whats_new_url = urljoin(MAIN_DOC_URL, 'whatsnew/')
+    yield WHATS_NEW_HEADER
+    version_links = [
+        urljoin(whats_new_url, href)
+        for href in get_backend(cli_args).whats_new_links(get_document(
+            session, whats_new_url, cli_args, WHATS_NEW_INDEX_SCOPE
+        ))
+    ]
+    positions = shards.select(version_links, str, shard)
+    version_links = [version_links[position] for position in positions]
+    records = crawl(
+        session,
+        version_links,
+        'whats_new_record',
+        cli_args,
+        WHATS_NEW_SCOPE
+    )
+    for (record, error), position, version_link in zip(
+        tqdm(records, total=len(version_links)), positions, version_links
+    ):
+        if error is not None:
+            logs.append(
+                SOUP_ERROR_MESSAGE.format(url=version_link, error=error)
+            )
+            continue
+        partial.append((position, version_link, *record))
+        yield (version_link, *record)
+    list(map(logging.error, logs))
+    if shard is not None:
+        save_shard(cli_args, {'rows': partial})
+
+
+def latest_versions(session, cli_args=None):
+    pattern = r'Python (?P<version>\d\.\d+) \((?P<status>.*)\)'
+    links = get_backend(cli_args).version_links(get_document(
+        session, MAIN_DOC_URL, cli_args, LATEST_VERSIONS_SCOPE
+    ))
+    if links is None:
+        raise RuntimeError(EMPTY_RESULT_MESSAGE)
+    yield ('Ссылка на документацию', 'Версия', 'Статус')
+    for link, text in links:
+        text_match = re.search(pattern, text)
+        if text_match:
+            version, status = text_match.groups()
+        else:
+            version, status = text, ''
+        yield (link, version, status)
+
+
+def download(session, cli_args=None):
+    downloads_url = urljoin(MAIN_DOC_URL, 'download.html')
+    pattern = (
+        ALL_ARCHIVES_PATTERN if getattr(cli_args, 'all_formats', False)
+        else PDF_A4_ARCHIVE_PATTERN
+    )
+    links = [
+        link for link in get_backend(cli_args).archive_links(get_document(
+            session, downloads_url, cli_args, DOWNLOAD_SCOPE
+        ))
+        if re.match(pattern, link)
+    ]
+    if pattern == PDF_A4_ARCHIVE_PATTERN:
+        links = links[:1]
+    if not links:
+        raise ParserFindTagException(
+            FIND_TAG_MESSAGE_ERROR.format(tag='a', attrs={'href': pattern})
+        )
+    downloads_dir = BASE_DIR / DOWNLOAD
+    downloads_dir.mkdir(exist_ok=True)
+    for link in links:
+        archive_url = urljoin(downloads_url, link)
+        archive_path = downloads_dir / archive_url.split('/')[-1]
+        segmented_download(
+            session,
+            archive_url,
+            archive_path,
+            getattr(cli_args, 'segments', DEFAULT_SEGMENTS)
+        )
+        logging.info(
+            LOADING_COMPLETE_MESSAGE.format(archive_path=archive_path)
+        )
+
+
+def pep_index(session, cli_args=None):
+    return [
+        (urljoin(MAIN_PEP_URL, href), type_and_status[1:])
+        for href, type_and_status in get_backend(cli_args).pep_rows(
+            get_document(session, MAIN_PEP_URL, cli_args, PEP_INDEX_SCOPE)
+        )
+    ]
+
+
+def is_fresh(record, preview_status, now, max_age):
+    return (
+        record is not None
+        and record['preview_status'] == preview_status
+        and now - record['checked_at'] < max_age
+    )
+
+
+def card_changed(session, row_link, record):
+    fingerprint = cached_fingerprint(session, row_link)
+    return (
+        None not in (fingerprint, record.get('fingerprint'))
+        and fingerprint != record['fingerprint']
+    )
+
+
+def pep_statuses(session, index, cli_args=None):
+    incremental = getattr(cli_args, 'incremental', False)
+    state_path = BASE_DIR / STATE / PEP_STATE_FILE
+    state = load_state(state_path) if incremental else {}
+    now = time.time()
+    max_age = getattr(cli_args, 'max_age', PEP_STATE_MAX_AGE)
+    stale_links = [
+        row_link for row_link, preview_status in index
+        if not is_fresh(state.get(row_link), preview_status, now, max_age)
+        or card_changed(session, row_link, state[row_link])
+    ]
+    stream = (
+        getattr(cli_args, 'stream_cards', False)
+        and getattr(cli_args, 'record', None) is None
+    )
+    fetched = dict(zip(stale_links, list(tqdm(
+        crawl(
+            session, stale_links, 'pep_status', cli_args, PEP_CARD_SCOPE,
+            stream
+        ),
+        total=len(stale_links)
+    ))))
+    if incremental:
+        for row_link, preview_status in index:
+            status, error = fetched.get(row_link, (None, True))
+            if error is None and status is not None:
+                state[row_link] = dict(
+                    preview_status=preview_status,
+                    status=status,
+                    checked_at=now,
+                    fingerprint=cached_fingerprint(session, row_link)
+                )
+        save_state(state_path, state)
+    return [
+        fetched.get(row_link) or (state[row_link]['status'], None)
+        for row_link, _ in index
+    ]
+
+
+def pep(session, cli_args=None):
+    count_pep_status = defaultdict(int)
+    first_seen = {}
+    logs = []
+    wrong_statuses_message = []
+    shard = getattr(cli_args, 'shard', None)
+    yield PEP_HEADER
+    index = pep_index(session, cli_args)
+    positions = shards.select(index, itemgetter(0), shard)
+    index = [index[position] for position in positions]
+    for position, (row_link, preview_status), (status, error) in zip(
+        positions, index, pep_statuses(session, index, cli_args)
+    ):
+        if error is not None:
+            logs.append(
+                SOUP_ERROR_MESSAGE.format(url=row_link, error=error)
+            )
+            continue
+        if status is None:
+            continue
+        if status[0] != preview_status:
+            wrong_statuses_message.append(
+                WRONG_STATUSES_MESSAGE.format(
+                    row_link=row_link,
+                    pep_status=status,
+                    expect_status=EXPECTED_STATUS[preview_status]
+                )
+            )
+        else:
+            count_pep_status[status] += 1
+            first_seen.setdefault(status, position)
+    list(map(logging.error, logs))
+    list(map(logging.info, wrong_statuses_message))
+    if shard is not None:
+        save_shard(cli_args, {'statuses': {
+            status: [count, first_seen[status]]
+            for status, count in count_pep_status.items()
+        }})
+    yield from count_pep_status.items()
+    yield (PEP_TOTAL, sum(count_pep_status.values()))
+
+
+def save_shard(cli_args, payload):
+    logging.info(SHARD_SAVED_MESSAGE.format(
+        path=shards.save(cli_args, payload)
+    ))
+
+
+MODE_FUNCTIONS = {
+    'whats-new': whats_new,
+    'latest-versions': latest_versions,
+    'download': download,
+    'pep': pep
+}
+
+SERVED_MODES = {
+    mode: function for mode, function in MODE_FUNCTIONS.items()
+    if function is not download
+}
@@ -1,10 +1,14 @@
 import csv
+import json
 import logging
+import time
 import datetime as dt
 
-from prettytable import PrettyTable
-
-from constants import BASE_DIR, DATETIME_FORMAT, RESULT, PRETTY, FILE
+from constants import (
+    BASE_DIR, DATETIME_FORMAT, RESULT, PRETTY, FILE, SQLITE, JSONL
+)
+import metrics
+from registry import lazy, resolve
 
 
 MESSAGE_PATTERN = 'Файл с результатами был сохранён: {file_path}'
@@ -15,32 +19,48 @@ def default_output(results, *args):
         print(*row)
 
 
-def pretty_output(results, *args):
-    table = PrettyTable()
-    table.field_names = results[0]
-    table.align = 'l'
-    table.add_rows(results[1:])
-    print(table)
-
-
-def file_output(results, cli_args):
+def get_result_path(cli_args, extension):
     results_dir = BASE_DIR / RESULT
     results_dir.mkdir(exist_ok=True)
-    parser_mode = cli_args.mode
     now_formatted = dt.datetime.now().strftime(DATETIME_FORMAT)
-    file_name = f'{parser_mode}_{now_formatted}.csv'
-    file_path = results_dir / file_name
-    with open(file_path, 'w', encoding='utf-8') as file:
+    return results_dir / f'{cli_args.mode}_{now_formatted}.{extension}'
+
+
+def file_output(results, cli_args):
+    file_path = get_result_path(cli_args, 'csv')
+    with open(file_path, 'w', encoding='utf-8', buffering=1) as file:
         csv.writer(file, dialect=csv.unix_dialect).writerows(results)
     logging.info(MESSAGE_PATTERN.format(file_path=file_path))
 
 
+def jsonl_output(results, cli_args):
+    results = iter(results)
+    header = next(results)
+    file_path = get_result_path(cli_args, 'jsonl')
+    with open(file_path, 'w', encoding='utf-8', buffering=1) as file:
+        for row in results:
+            file.write(
+                json.dumps(dict(zip(header, row)), ensure_ascii=False) + '\n'
+            )
+    logging.info(MESSAGE_PATTERN.format(file_path=file_path))
+
+
 OUTPUTS = {
-    PRETTY: pretty_output,
-    FILE: file_output,
-    None: default_output
+    PRETTY: 'tables:pretty_output',
+    FILE: 'outputs:file_output',
+    SQLITE: 'tables:sqlite_output',
+    JSONL: 'outputs:jsonl_output',
+    None: 'outputs:default_output'
 }
 
+pretty_output = lazy(OUTPUTS[PRETTY])
+sqlite_output = lazy(OUTPUTS[SQLITE])
+
 
 def control_output(results, cli_args):
-    OUTPUTS[cli_args.output](results, cli_args)
+    producing = []
+    started = time.perf_counter()
+    resolve(OUTPUTS[cli_args.output])(
+        metrics.timed_iteration(results, producing), cli_args
+    )
+    metrics.observe('output', time.perf_counter() - started - sum(producing))
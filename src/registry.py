@@ -0,0 +1,13 @@
+from importlib import import_module
+
+
+def resolve(target):
+    module, _, name = target.partition(':')
+    return getattr(import_module(module), name)
+
+
+def lazy(target):
+    def run_target(*args, **kwargs):
+        return resolve(target)(*args, **kwargs)
+    run_target.__name__ = target.partition(':')[2]
+    return run_target
@@ -0,0 +1,93 @@
+import hashlib
+import heapq
+import json
+import logging
+import random
+import time
+from argparse import Namespace
+from threading import Event
+
+import metrics
+from outputs import control_output
+from utils import shared_pages, shared_records
+
+
+UNCHANGED_MESSAGE = 'Результаты режима {mode} не изменились'
+CHANGED_MESSAGE = 'Результаты режима {mode} обновлены'
+WATCH_ERROR_MESSAGE = 'Возникла ошибка в режиме {mode}: {error}'
+NEXT_RUN_MESSAGE = 'Следующий запуск режима {mode} через {delay:.0f} c'
+WATCH_STOP_MESSAGE = 'Наблюдение остановлено'
+
+
+def results_digest(rows):
+    return hashlib.sha256(
+        json.dumps(rows, ensure_ascii=False, default=str).encode('utf-8')
+    ).hexdigest()
+
+
+class Scheduler:
+
+    def __init__(self, session, cli_args, modes, intervals, jitter):
+        self.session = session
+        self.cli_args = cli_args
+        self.modes = modes
+        self.intervals = intervals
+        self.jitter = jitter
+        self.digests = {}
+        now = time.monotonic()
+        self.queue = [
+            (now + random.uniform(0, jitter * interval), mode)
+            for mode, interval in intervals.items()
+        ]
+        heapq.heapify(self.queue)
+
+    def next_delay(self, mode):
+        return self.intervals[mode] * random.uniform(
+            1 - self.jitter, 1 + self.jitter
+        )
+
+    def run_mode(self, mode):
+        mode_args = Namespace(**{**vars(self.cli_args), 'mode': mode})
+        metrics.set_mode(mode)
+        results = self.modes[mode](self.session, mode_args)
+        if results is None:
+            return True
+        rows = list(results)
+        digest = results_digest(rows)
+        if self.digests.get(mode) == digest:
+            logging.info(UNCHANGED_MESSAGE.format(mode=mode))
+            return False
+        control_output(rows, mode_args)
+        self.digests[mode] = digest
+        logging.info(CHANGED_MESSAGE.format(mode=mode))
+        return True
+
+    def run_pending(self, now=None):
+        now = time.monotonic() if now is None else now
+        due = []
+        while self.queue and self.queue[0][0] <= now:
+            due.append(heapq.heappop(self.queue)[1])
+        with shared_pages():
+            for mode in due:
+                try:
+                    self.run_mode(mode)
+                except Exception as error:
+                    logging.error(
+                        WATCH_ERROR_MESSAGE.format(mode=mode, error=error),
+                        stack_info=True
+                    )
+                delay = self.next_delay(mode)
+                heapq.heappush(self.queue, (time.monotonic() + delay, mode))
+                logging.info(NEXT_RUN_MESSAGE.format(mode=mode, delay=delay))
+        return due
+
+    def run_forever(self, stopped=None):
+        stopped = Event() if stopped is None else stopped
+        try:
+            with shared_records():
+                while not stopped.wait(
+                    max(self.queue[0][0] - time.monotonic(), 0)
+                ):
+                    self.run_pending()
+        except KeyboardInterrupt:
+            logging.info(WATCH_STOP_MESSAGE)
@@ -0,0 +1,159 @@
+import json
+import logging
+import time
+from argparse import Namespace
+from concurrent.futures import Future, ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from threading import Event, Lock, Thread
+from urllib.parse import urlsplit
+
+from constants import ENCODING
+from utils import shared_pages, shared_records
+
+
+UNKNOWN_MODE_MESSAGE = 'Неизвестный режим: {mode}'
+MODE_FAILED_MESSAGE = 'Не удалось получить результаты режима {mode}: {error}'
+REFRESH_FAILED_MESSAGE = (
+    'Не удалось обновить результаты режима {mode}: {error}'
+)
+SERVER_START_MESSAGE = 'Сервер запущен: http://{host}:{port}/'
+SERVER_STOP_MESSAGE = 'Сервер остановлен'
+REQUEST_LOG_MESSAGE = 'Запрос {address}: {message}'
+
+
+class ResultStore:
+
+    def __init__(self, session, cli_args, modes, ttl, workers=2):
+        self.session = session
+        self.cli_args = cli_args
+        self.modes = modes
+        self.ttl = ttl
+        self.entries = {}
+        self.pending = {}
+        self.lock = Lock()
+        self.executor = ThreadPoolExecutor(max_workers=workers)
+
+    def compute(self, mode):
+        mode_args = Namespace(**{**vars(self.cli_args), 'mode': mode})
+        return list(self.modes[mode](self.session, mode_args))
+
+    def run(self, mode, future):
+        try:
+            rows = self.compute(mode)
+        except Exception as error:
+            with self.lock:
+                del self.pending[mode]
+            future.set_exception(error)
+            return
+        with self.lock:
+            self.entries[mode] = rows, time.monotonic()
+            del self.pending[mode]
+        future.set_result(rows)
+
+    def refresh(self, mode):
+        with self.lock:
+            if mode in self.pending:
+                return self.pending[mode]
+            future = self.pending[mode] = Future()
+        self.executor.submit(self.run, mode, future)
+        return future
+
+    def get(self, mode):
+        with self.lock:
+            entry = self.entries.get(mode)
+        if entry is None:
+            return self.refresh(mode).result(), 0
+        rows, updated_at = entry
+        age = time.monotonic() - updated_at
+        if age >= self.ttl:
+            self.refresh_in_background(mode)
+        return rows, age
+
+    def refresh_in_background(self, mode):
+        def log_error(future):
+            if future.exception() is not None:
+                logging.error(REFRESH_FAILED_MESSAGE.format(
+                    mode=mode, error=future.exception()
+                ))
+        self.refresh(mode).add_done_callback(log_error)
+
+    def refresh_expired(self):
+        with self.lock:
+            expired = [
+                mode for mode, (_, updated_at) in self.entries.items()
+                if time.monotonic() - updated_at >= self.ttl
+            ]
+        for mode in expired:
+            self.refresh_in_background(mode)
+
+    def refresh_forever(self, stopped):
+        while not stopped.wait(max(self.ttl, 1)):
+            self.refresh_expired()
+
+    def close(self):
+        self.executor.shutdown(wait=False)
+
+
+class ResultHandler(BaseHTTPRequestHandler):
+
+    def send_json(self, status, payload):
+        body = json.dumps(payload, ensure_ascii=False).encode(ENCODING)
+        self.send_response(status)
+        self.send_header(
+            'Content-Type', f'application/json; charset={ENCODING}'
+        )
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_GET(self):
+        store = self.server.store
+        mode = urlsplit(self.path).path.strip('/')
+        if not mode:
+            return self.send_json(200, {'modes': list(store.modes)})
+        if mode not in store.modes:
+            return self.send_json(
+                404, {'error': UNKNOWN_MODE_MESSAGE.format(mode=mode)}
+            )
+        try:
+            rows, age = store.get(mode)
+        except Exception as error:
+            return self.send_json(500, {
+                'error': MODE_FAILED_MESSAGE.format(mode=mode, error=error)
+            })
+        self.send_json(200, {
+            'mode': mode,
+            'age': round(age, 3),
+            'header': rows[0],
+            'rows': rows[1:],
+        })
+
+    def log_message(self, format, *args):
+        logging.info(REQUEST_LOG_MESSAGE.format(
+            address=self.address_string(), message=format % args
+        ))
+
+
+def make_server(store, host, port):
+    server = ThreadingHTTPServer((host, port), ResultHandler)
+    server.daemon_threads = True
+    server.store = store
+    return server
+
+
+def serve(store, host, port):
+    server = make_server(store, host, port)
+    stopped = Event()
+    Thread(target=store.refresh_forever, args=(stopped,), daemon=True).start()
+    logging.info(SERVER_START_MESSAGE.format(
+        host=host, port=server.server_port
+    ))
+    with shared_pages(max_age=store.ttl), shared_records():
+        try:
+            server.serve_forever()
+        except KeyboardInterrupt:
+            logging.info(SERVER_STOP_MESSAGE)
+        finally:
+            stopped.set()
+            server.server_close()
+            store.close()
@@ -0,0 +1,100 @@
+import json
+import zlib
+
+from constants import (
+    BASE_DIR, ENCODING, PART_SUFFIX, RESULT, SHARDS_DIR, SHARD_FILE,
+    SHARD_GLOB, WHATS_NEW_HEADER, PEP_HEADER, PEP_TOTAL
+)
+
+
+SHARDS_MISSING_MESSAGE = (
+    'Для режима {mode} не хватает частей {missing} из {count}'
+)
+SHARDS_MISMATCH_MESSAGE = (
+    'Части режима {mode} получены при разном числе частей: {counts}'
+)
+
+
+def in_shard(key, shard):
+    index, count = shard
+    return zlib.crc32(key.encode(ENCODING)) % count == index - 1
+
+
+def select(rows, key, shard=None):
+    return [
+        position for position, row in enumerate(rows)
+        if shard is None or in_shard(key(row), shard)
+    ]
+
+
+def shard_dir(cli_args=None):
+    return (
+        getattr(cli_args, 'shard_dir', None) or BASE_DIR / RESULT / SHARDS_DIR
+    )
+
+
+def save(cli_args, payload):
+    index, count = cli_args.shard
+    directory = shard_dir(cli_args)
+    directory.mkdir(parents=True, exist_ok=True)
+    path = directory / SHARD_FILE.format(
+        mode=cli_args.mode, index=index, count=count
+    )
+    part_path = path.with_name(path.name + PART_SUFFIX)
+    with open(part_path, 'w', encoding=ENCODING) as file:
+        json.dump(
+            {'mode': cli_args.mode, 'shard': [index, count], **payload},
+            file,
+            ensure_ascii=False
+        )
+    part_path.replace(path)
+    return path
+
+
+def load(cli_args, mode):
+    parts = {}
+    for path in sorted(shard_dir(cli_args).glob(SHARD_GLOB.format(mode=mode))):
+        with open(path, encoding=ENCODING) as file:
+            part = json.load(file)
+        parts[tuple(part['shard'])] = part
+    if not parts:
+        return []
+    counts = sorted({count for _, count in parts})
+    if len(counts) > 1:
+        raise ValueError(
+            SHARDS_MISMATCH_MESSAGE.format(mode=mode, counts=counts)
+        )
+    missing = sorted(
+        set(range(1, counts[0] + 1)) - {index for index, _ in parts}
+    )
+    if missing:
+        raise ValueError(SHARDS_MISSING_MESSAGE.format(
+            mode=mode, missing=missing, count=counts[0]
+        ))
+    return [parts[shard] for shard in sorted(parts)]
+
+
+def merge_whats_new(parts):
+    yield WHATS_NEW_HEADER
+    for _, *row in sorted(row for part in parts for row in part['rows']):
+        yield tuple(row)
+
+
+def merge_pep(parts):
+    statuses = {}
+    for part in parts:
+        for status, (count, position) in part['statuses'].items():
+            total, first = statuses.get(status, (0, position))
+            statuses[status] = total + count, min(first, position)
+    yield PEP_HEADER
+    for status, (count, _) in sorted(
+        statuses.items(), key=lambda item: item[1][1]
+    ):
+        yield (status, count)
+    yield (PEP_TOTAL, sum(count for count, _ in statuses.values()))
+
+
+MERGE_FUNCTIONS = {
+    'whats-new': merge_whats_new,
+    'pep': merge_pep,
+}
@@ -0,0 +1,158 @@
+import hashlib
+import json
+import mmap
+import time
+from contextlib import contextmanager
+from io import BytesIO
+from threading import Lock
+
+from requests import ConnectionError, Request
+from requests.adapters import HTTPAdapter
+from urllib3 import HTTPResponse
+
+from constants import ENCODING, SNAPSHOT_DATA, SNAPSHOT_INDEX
+
+
+SNAPSHOT_NOT_FOUND_MESSAGE = 'В каталоге {directory} нет снимка страниц'
+SNAPSHOT_MISSING_MESSAGE = 'Страницы {url} нет в снимке'
+
+SKIPPED_HEADERS = {'content-encoding', 'content-length', 'transfer-encoding'}
+
+SNAPSHOT_STATE = {'writer': None}
+
+
+def snapshot_key(url):
+    return Request('GET', url).prepare().url
+
+
+def read_index(directory):
+    path = directory / SNAPSHOT_INDEX
+    if not path.exists():
+        return
+    with open(path, encoding=ENCODING) as file:
+        for line in file:
+            if line.endswith('\n'):
+                yield json.loads(line)
+
+
+class SnapshotWriter:
+
+    def __init__(self, directory):
+        directory.mkdir(parents=True, exist_ok=True)
+        self.lock = Lock()
+        self.bodies = {}
+        self.latest = {}
+        for entry in read_index(directory):
+            self.bodies[entry['digest']] = entry['offset'], entry['size']
+            self.latest[entry['url']] = entry['status'], entry['digest']
+        self.data = open(directory / SNAPSHOT_DATA, 'ab')
+        self.index = open(directory / SNAPSHOT_INDEX, 'a', encoding=ENCODING)
+
+    def add(self, url, status, headers, content):
+        url = snapshot_key(url)
+        digest = hashlib.sha256(content).hexdigest()
+        with self.lock:
+            if self.latest.get(url) == (status, digest):
+                return
+            if digest not in self.bodies:
+                self.bodies[digest] = self.data.tell(), len(content)
+                self.data.write(content)
+                self.data.flush()
+            offset, size = self.bodies[digest]
+            self.index.write(json.dumps({
+                'url': url,
+                'status': status,
+                'headers': {
+                    name: value for name, value in headers.items()
+                    if name.lower() not in SKIPPED_HEADERS
+                },
+                'digest': digest,
+                'offset': offset,
+                'size': size,
+                'recorded_at': time.time(),
+            }, ensure_ascii=False) + '\n')
+            self.index.flush()
+            self.latest[url] = status, digest
+
+    def close(self):
+        self.data.close()
+        self.index.close()
+
+
+class SnapshotReader:
+
+    def __init__(self, directory):
+        if not (directory / SNAPSHOT_INDEX).exists():
+            raise FileNotFoundError(
+                SNAPSHOT_NOT_FOUND_MESSAGE.format(directory=directory)
+            )
+        self.entries = {
+            entry['url']: entry for entry in read_index(directory)
+        }
+        path = directory / SNAPSHOT_DATA
+        with open(path, 'rb') as file:
+            self.data = mmap.mmap(
+                file.fileno(), 0, access=mmap.ACCESS_READ
+            ) if path.stat().st_size else b''
+
+    def get(self, url):
+        entry = self.entries.get(snapshot_key(url))
+        if entry is None:
+            return None
+        offset = entry['offset']
+        return (
+            entry['status'],
+            entry['headers'],
+            self.data[offset:offset + entry['size']]
+        )
+
+    def close(self):
+        if isinstance(self.data, mmap.mmap):
+            self.data.close()
+
+
+class ReplayAdapter(HTTPAdapter):
+
+    def __init__(self, reader, *args, **kwargs):
+        self.reader = reader
+        super().__init__(*args, **kwargs)
+
+    def send(self, request, **kwargs):
+        snapshot = self.reader.get(request.url)
+        if snapshot is None:
+            raise ConnectionError(
+                SNAPSHOT_MISSING_MESSAGE.format(url=request.url),
+                request=request
+            )
+        status, headers, content = snapshot
+        return self.build_response(request, HTTPResponse(
+            body=BytesIO(content),
+            headers=headers,
+            status=status,
+            preload_content=False,
+            decode_content=False,
+            request_url=request.url
+        ))
+
+    def close(self):
+        super().close()
+        self.reader.close()
+
+
+@contextmanager
+def recording(directory=None):
+    if directory is None:
+        yield None
+        return
+    writer = SNAPSHOT_STATE['writer'] = SnapshotWriter(directory)
+    try:
+        yield writer
+    finally:
+        SNAPSHOT_STATE['writer'] = None
+        writer.close()
+
+
+def record(url, status, headers, content):
+    writer = SNAPSHOT_STATE['writer']
+    if writer is not None:
+        writer.add(url, status, headers, content)
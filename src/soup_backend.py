@@ -0,0 +1,56 @@
+from utils import find_tag, make_soup
+
+
+def parse(markup, scope=None, encoding=None):
+    return make_soup(markup, scope=scope, encoding=encoding)
+
+
+def whats_new_links(document):
+    return [
+        a_tag['href'] for a_tag in document.select(
+            '#what-s-new-in-python div.toctree-wrapper '
+            'li.toctree-l1 a:-soup-contains("What’s New")'
+        )
+    ]
+
+
+def whats_new_record(document):
+    return (
+        find_tag(document, 'h1').text,
+        find_tag(document, 'dl').text.replace('\n', ' ')
+    )
+
+
+def version_links(document):
+    for ul in document.select('div.sphinxsidebarwrapper > ul'):
+        if 'All versions' in ul.text:
+            return [(tag['href'], tag.text) for tag in ul.find_all('a')]
+    return None
+
+
+def archive_links(document):
+    return [
+        a_tag['href']
+        for a_tag in find_tag(document, 'table').find_all('a', href=True)
+    ]
+
+
+def pep_rows(document):
+    return [
+        (
+            find_tag(
+                row, 'a', attrs={'class': 'pep reference internal'}
+            )['href'],
+            find_tag(row, 'abbr').text
+        )
+        for row in document.select('#numerical-index tr')[1:]
+    ]
+
+
+def pep_status(document):
+    pep_title = find_tag(
+        document, 'dl', attrs={'class': 'rfc2822 field-list simple'}
+    )
+    for tag in pep_title:
+        if tag.name == 'dt' and tag.text == 'Status:':
+            return tag.next_sibling.next_sibling.get_text(strip=True)
@@ -0,0 +1,68 @@
+import logging
+import sqlite3
+import datetime as dt
+from itertools import islice
+
+from prettytable import PrettyTable
+
+from constants import (
+    BASE_DIR, DATETIME_FORMAT, RESULT, SQLITE_FILE, SQLITE_BATCH_SIZE
+)
+
+
+SQLITE_MESSAGE_PATTERN = (
+    'В таблицу {table} базы {file_path} добавлено строк: {count}'
+)
+
+
+def pretty_output(results, *args):
+    results = list(results)
+    table = PrettyTable()
+    table.field_names = results[0]
+    table.align = 'l'
+    table.add_rows(results[1:])
+    print(table)
+
+
+def quote(name):
+    return '"{}"'.format(str(name).replace('"', '""'))
+
+
+def sqlite_output(results, cli_args):
+    results = iter(results)
+    header = next(results)
+    table = quote(cli_args.mode.replace('-', '_'))
+    columns = ', '.join(map(quote, header))
+    run_at = dt.datetime.now().strftime(DATETIME_FORMAT)
+    results_dir = BASE_DIR / RESULT
+    results_dir.mkdir(exist_ok=True)
+    file_path = results_dir / SQLITE_FILE
+    count = 0
+    connection = sqlite3.connect(file_path)
+    try:
+        with connection:
+            connection.execute(
+                f'CREATE TABLE IF NOT EXISTS {table} '
+                f'(run_at TEXT NOT NULL, {columns})'
+            )
+            connection.execute(
+                f'CREATE INDEX IF NOT EXISTS '
+                f'{quote(cli_args.mode + "_run_at")} ON {table} (run_at)'
+            )
+            insert = (
+                f'INSERT INTO {table} (run_at, {columns}) '
+                f'VALUES (?{", ?" * len(header)})'
+            )
+            while True:
+                batch = list(islice(results, SQLITE_BATCH_SIZE))
+                if not batch:
+                    break
+                connection.executemany(
+                    insert, [(run_at, *row) for row in batch]
+                )
+                count += len(batch)
+    finally:
+        connection.close()
+    logging.info(SQLITE_MESSAGE_PATTERN.format(
+        table=table, file_path=file_path, count=count
+    ))
@@ -1,17 +1,89 @@
+import hashlib
+import json
+import time
+from collections import Counter, OrderedDict, deque
+from concurrent.futures import (
+    Future, ProcessPoolExecutor, ThreadPoolExecutor
+)
+from contextlib import contextmanager
+from functools import partial
+from importlib import import_module
+from itertools import islice
+from multiprocessing import get_all_start_methods, get_context
+from threading import Lock
+
+from constants import (
+    ASYNC_ENGINE, DEFAULT_WORKERS, DOWNLOAD_CHUNK_SIZE, ENCODING, PART_SUFFIX,
+    SOUP_BACKEND, LXML_BACKEND, CACHE_HIT, CACHE_MISS, CACHE_REVALIDATION,
+    PAGE_MEMO_SIZE, STREAM_CHUNK_SIZE, VALIDATOR_SUFFIX
+)
+import metrics
+import snapshots
+from cache_storage import touch
 from exceptions import ParserFindTagException
 
-from bs4 import BeautifulSoup
-from requests import RequestException, ConnectionError
+from bs4 import BeautifulSoup, SoupStrainer
+from lxml import etree
+from requests import RequestException, ConnectionError, Request
 
 
 REQUEST_MESSAGE_ERROR = 'Возникла ошибка при загрузке страницы {url}: {error}'
 FIND_TAG_MESSAGE_ERROR = 'Не найден тег {tag} {attrs}'
 
+BACKENDS = {
+    SOUP_BACKEND: 'soup_backend',
+    LXML_BACKEND: 'lxml_backend',
+}
+
+PARTIAL_CONTENT = 206
+RANGE_NOT_SATISFIABLE = 416
+
+QUEUE_FACTOR = 2
+
+NO_STORE = {'Cache-Control': 'no-store'}
+
+CACHE_STATS = Counter()
+CACHE_STATS_LOCK = Lock()
+RECENT_CACHE_KEYS = set()
+
+PAGE_MEMO = OrderedDict()
+PAGE_MEMO_LOCK = Lock()
+PAGE_MEMO_STATE = {'enabled': False, 'max_age': None}
+
+RECORD_MEMO = {}
+RECORD_MEMO_LOCK = Lock()
+RECORD_MEMO_STATE = {'enabled': False}
+
+
+def record_cache_usage(usage, cache_key=None):
+    with CACHE_STATS_LOCK:
+        CACHE_STATS[usage] += 1
+        if cache_key is not None:
+            RECENT_CACHE_KEYS.add(cache_key)
+    metrics.increment(f'cache_{usage}')
+
+
+def count_cache_usage(response):
+    if not getattr(response, 'from_cache', False):
+        usage = CACHE_MISS
+    elif getattr(response, 'revalidated', False):
+        usage = CACHE_REVALIDATION
+    else:
+        usage = CACHE_HIT
+    record_cache_usage(usage, getattr(response, 'cache_key', None))
+
 
-def get_response(session, url, encoding='utf-8'):
+def get_response(session, url, encoding=ENCODING):
     try:
-        response = session.get(url)
-        response.encoding = encoding
+        with metrics.timer('network'):
+            response = session.get(url)
+            response.encoding = encoding
+        count_cache_usage(response)
+        touch(session, getattr(response, 'cache_key', None))
+        metrics.increment('bytes', len(response.content))
+        snapshots.record(
+            url, response.status_code, response.headers, response.content
+        )
         return response
     except RequestException as error:
         raise ConnectionError(
@@ -19,6 +91,189 @@ def get_response(session, url, encoding='utf-8'):
         )
 
 
+def get_cache_key(session, url):
+    return session.cache.create_key(
+        session.prepare_request(Request('GET', url))
+    )
+
+
+def is_cached(session, url):
+    if session.settings.disabled:
+        return False
+    cached = session.cache.get_response(get_cache_key(session, url))
+    return cached is not None and not cached.is_expired
+
+
+def cached_fingerprint(session, url):
+    if getattr(session, 'cache', None) is None or session.settings.disabled:
+        return None
+    cached = session.cache.get_response(get_cache_key(session, url))
+    if cached is None:
+        return None
+    return cached.headers.get('ETag') or hashlib.sha256(
+        cached.content
+    ).hexdigest()
+
+
+def read_until(chunks, scope):
+    tag, attrs = scope
+    parser = etree.HTMLPullParser(events=('end',), tag=tag, encoding=ENCODING)
+    prefix = bytearray()
+    for chunk in chunks:
+        prefix += chunk
+        parser.feed(chunk)
+        if any(
+            all(element.get(name) == value for name, value in attrs.items())
+            for _, element in parser.read_events()
+        ):
+            break
+    return bytes(prefix)
+
+
+def stream_prefix(session, url, scope, chunk_size=STREAM_CHUNK_SIZE):
+    if is_cached(session, url):
+        response = get_response(session, url)
+        return (
+            read_until(response.iter_content(chunk_size), scope),
+            response.encoding
+        )
+    try:
+        with metrics.timer('network'), session.get(
+            url, stream=True, headers=NO_STORE
+        ) as response:
+            prefix = read_until(response.iter_content(chunk_size), scope)
+    except RequestException as error:
+        raise ConnectionError(
+            REQUEST_MESSAGE_ERROR.format(url=url, error=error)
+        )
+    count_cache_usage(response)
+    metrics.increment('bytes', len(prefix))
+    return prefix, ENCODING
+
+
+def download_validator(headers):
+    etag = headers.get('ETag')
+    if etag and not etag.startswith('W/'):
+        return etag
+    return headers.get('Last-Modified')
+
+
+def resume_matches(response, offset):
+    content_range = response.headers.get('Content-Range', '')
+    if response.status_code == RANGE_NOT_SATISFIABLE:
+        return content_range == f'bytes */{offset}'
+    return (
+        response.status_code != PARTIAL_CONTENT
+        or content_range.startswith(f'bytes {offset}-')
+    )
+
+
+def save_download(response, part_path, validator_path, chunk_size):
+    resumed = response.status_code == PARTIAL_CONTENT
+    if not resumed:
+        validator = download_validator(response.headers)
+        if validator is None:
+            validator_path.unlink(missing_ok=True)
+        else:
+            validator_path.write_text(validator, encoding=ENCODING)
+    with open(part_path, 'ab' if resumed else 'wb') as file:
+        for chunk in response.iter_content(chunk_size):
+            file.write(chunk)
+
+
+def stream_download(session, url, path, chunk_size=DOWNLOAD_CHUNK_SIZE):
+    part_path = path.with_name(path.name + PART_SUFFIX)
+    validator_path = path.with_name(path.name + VALIDATOR_SUFFIX)
+    offset = (
+        part_path.stat().st_size
+        if part_path.exists() and validator_path.exists() else 0
+    )
+    headers = {
+        'Range': f'bytes={offset}-',
+        'If-Range': validator_path.read_text(encoding=ENCODING)
+    } if offset else {}
+    try:
+        with session.cache_disabled():
+            response = session.get(url, headers=headers, stream=True)
+            if offset and not resume_matches(response, offset):
+                response.close()
+                response = session.get(url, stream=True)
+            with response:
+                if response.status_code != RANGE_NOT_SATISFIABLE:
+                    response.raise_for_status()
+                    save_download(
+                        response, part_path, validator_path, chunk_size
+                    )
+    except RequestException as error:
+        raise ConnectionError(
+            REQUEST_MESSAGE_ERROR.format(url=url, error=error)
+        )
+    part_path.replace(path)
+    validator_path.unlink(missing_ok=True)
+    return path
+
+
+def download_range(session, url, path, byte_range, chunk_size):
+    start, end = byte_range
+    with session.get(
+        url, headers={'Range': f'bytes={start}-{end}'}, stream=True
+    ) as response:
+        response.raise_for_status()
+        if (
+            response.status_code != PARTIAL_CONTENT
+            or not response.headers.get('Content-Range', '').startswith(
+                f'bytes {start}-{end}/'
+            )
+        ):
+            return False
+        with open(path, 'r+b') as file:
+            file.seek(start)
+            for chunk in response.iter_content(chunk_size):
+                file.write(chunk)
+    return True
+
+
+def segmented_download(
+    session, url, path, segments=1, chunk_size=DOWNLOAD_CHUNK_SIZE
+):
+    try:
+        with session.cache_disabled():
+            headers = session.head(url, allow_redirects=True).headers
+            size = int(headers.get('Content-Length', 0))
+            if (
+                segments <= 1 or size == 0
+                or headers.get('Accept-Ranges') != 'bytes'
+            ):
+                return stream_download(session, url, path, chunk_size)
+            part_path = path.with_name(path.name + PART_SUFFIX)
+            path.with_name(path.name + VALIDATOR_SUFFIX).unlink(
+                missing_ok=True
+            )
+            with open(part_path, 'wb') as file:
+                file.truncate(size)
+            step = -(-size // segments)
+            with ThreadPoolExecutor(max_workers=segments) as executor:
+                ranged = all(executor.map(
+                    partial(
+                        download_range, session, url, part_path,
+                        chunk_size=chunk_size
+                    ),
+                    [
+                        (start, min(start + step, size) - 1)
+                        for start in range(0, size, step)
+                    ]
+                ))
+            if not ranged:
+                part_path.unlink()
+                return stream_download(session, url, path, chunk_size)
+    except RequestException as error:
+        raise ConnectionError(
+            REQUEST_MESSAGE_ERROR.format(url=url, error=error)
+        )
+    part_path.replace(path)
+    return path
+
+
 def find_tag(soup, tag, attrs=None):
     searched_tag = soup.find(tag, attrs={} if attrs is None else attrs)
     if searched_tag is None:
@@ -28,5 +283,226 @@ def find_tag(soup, tag, attrs=None):
     return searched_tag
 
 
-def get_soup(session, url, format='lxml'):
-    return BeautifulSoup(get_response(session, url).text, features=format)
+def make_soup(markup, format='lxml', scope=None, encoding=None):
+    return BeautifulSoup(
+        markup,
+        features=format,
+        parse_only=None if scope is None else SoupStrainer(*scope),
+        from_encoding=encoding
+    )
+
+
+def get_soup(session, url, format='lxml', scope=None):
+    response = get_response(session, url)
+    with metrics.timer('parse'):
+        return make_soup(response.content, format, scope, response.encoding)
+
+
+def get_backend(cli_args=None):
+    return import_module(
+        BACKENDS[getattr(cli_args, 'backend', SOUP_BACKEND)]
+    )
+
+
+def parse_content(content, encoding, cli_args=None, scope=None):
+    backend = get_backend(cli_args)
+    with metrics.timer('parse'):
+        if getattr(cli_args, 'decode_text', False):
+            return backend.parse(
+                str(content, encoding, errors='replace'), scope
+            )
+        return backend.parse(content, scope, encoding)
+
+
+@contextmanager
+def shared_pages(max_age=None):
+    PAGE_MEMO_STATE.update(enabled=True, max_age=max_age)
+    try:
+        yield PAGE_MEMO
+    finally:
+        PAGE_MEMO_STATE.update(enabled=False, max_age=None)
+        with PAGE_MEMO_LOCK:
+            PAGE_MEMO.clear()
+
+
+@contextmanager
+def shared_records():
+    RECORD_MEMO_STATE['enabled'] = True
+    try:
+        yield RECORD_MEMO
+    finally:
+        RECORD_MEMO_STATE['enabled'] = False
+        with RECORD_MEMO_LOCK:
+            RECORD_MEMO.clear()
+
+
+def load_page(session, url):
+    if not PAGE_MEMO_STATE['enabled']:
+        response = get_response(session, url)
+        return response.content, response.encoding
+    max_age = PAGE_MEMO_STATE['max_age']
+    with PAGE_MEMO_LOCK:
+        if url in PAGE_MEMO:
+            content, encoding, stored_at = PAGE_MEMO[url]
+            if max_age is None or time.monotonic() - stored_at < max_age:
+                PAGE_MEMO.move_to_end(url)
+                return content, encoding
+    response = get_response(session, url)
+    with PAGE_MEMO_LOCK:
+        PAGE_MEMO[url] = response.content, response.encoding, time.monotonic()
+        PAGE_MEMO.move_to_end(url)
+        if len(PAGE_MEMO) > PAGE_MEMO_SIZE:
+            PAGE_MEMO.popitem(last=False)
+    return response.content, response.encoding
+
+
+def get_document(session, url, cli_args=None, scope=None):
+    return parse_content(*load_page(session, url), cli_args, scope)
+
+
+def extract_document(document, extract, cli_args=None):
+    with metrics.timer('extract'):
+        return getattr(get_backend(cli_args), extract)(document)
+
+
+def extract_page(session, url, extract, cli_args=None, scope=None):
+    content, encoding = load_page(session, url)
+    if not RECORD_MEMO_STATE['enabled']:
+        return extract_document(
+            parse_content(content, encoding, cli_args, scope),
+            extract,
+            cli_args
+        )
+    key = (
+        url,
+        extract,
+        repr(scope),
+        getattr(cli_args, 'backend', SOUP_BACKEND),
+        getattr(cli_args, 'decode_text', False)
+    )
+    digest = hashlib.sha256(content).hexdigest()
+    with RECORD_MEMO_LOCK:
+        memo = RECORD_MEMO.get(key)
+    if memo is not None and memo[0] == digest:
+        return memo[1]
+    record = extract_document(
+        parse_content(content, encoding, cli_args, scope), extract, cli_args
+    )
+    with RECORD_MEMO_LOCK:
+        RECORD_MEMO[key] = digest, record
+    return record
+
+
+def fetch_record(
+    session, url, extract, cli_args=None, scope=None, stream=False
+):
+    try:
+        if not stream:
+            return extract_page(session, url, extract, cli_args, scope), None
+        document = parse_content(
+            *stream_prefix(session, url, scope), cli_args, scope
+        )
+    except ConnectionError as error:
+        return None, error
+    return extract_document(document, extract, cli_args), None
+
+
+def fetch_content(session, url, scope=None, stream=False):
+    try:
+        if stream:
+            return (*stream_prefix(session, url, scope), None)
+        response = get_response(session, url)
+    except ConnectionError as error:
+        failed = Future()
+        failed.set_result(((None, error), []))
+        return None, None, failed
+    return response.content, response.encoding, None
+
+
+def extract_record(content, encoding, extract, cli_args=None, scope=None):
+    return (
+        extract_document(
+            parse_content(content, encoding, cli_args, scope),
+            extract,
+            cli_args
+        ),
+        None
+    ), metrics.drain()
+
+
+def process_context():
+    return get_context(
+        'forkserver' if 'forkserver' in get_all_start_methods() else 'spawn'
+    )
+
+
+def crawl_pipeline(
+    session, urls, extract, cli_args, scope=None, stream=False
+):
+    workers = getattr(cli_args, 'workers', DEFAULT_WORKERS)
+    processes = cli_args.parse_processes
+    urls = iter(urls)
+    fetching, parsing = deque(), deque()
+    with ThreadPoolExecutor(max_workers=workers) as fetchers, \
+            ProcessPoolExecutor(
+                max_workers=processes,
+                mp_context=process_context(),
+                initializer=metrics.reset
+            ) as parsers:
+        while True:
+            for url in islice(urls, QUEUE_FACTOR * workers - len(fetching)):
+                fetching.append(fetchers.submit(
+                    fetch_content, session, url, scope, stream
+                ))
+            if not fetching and not parsing:
+                return
+            if fetching and len(parsing) < QUEUE_FACTOR * processes:
+                content, encoding, failed = fetching.popleft().result()
+                parsing.append(failed or parsers.submit(
+                    extract_record, content, encoding, extract, cli_args,
+                    scope
+                ))
+                continue
+            result, samples = parsing.popleft().result()
+            metrics.merge(samples)
+            yield result
+
+
+def crawl(session, urls, extract, cli_args=None, scope=None, stream=False):
+    workers = getattr(cli_args, 'workers', DEFAULT_WORKERS)
+    if getattr(cli_args, 'parse_processes', 0) > 0:
+        yield from crawl_pipeline(
+            session, urls, extract, cli_args, scope, stream
+        )
+        return
+    if (
+        getattr(cli_args, 'engine', None) == ASYNC_ENGINE
+        and getattr(cli_args, 'replay', None) is None
+    ):
+        from async_utils import crawl_async
+        yield from crawl_async(session, urls, extract, cli_args, scope)
+        return
+    fetch = partial(
+        fetch_record, session, extract=extract, cli_args=cli_args,
+        scope=scope, stream=stream
+    )
+    if workers <= 1:
+        yield from map(fetch, urls)
+        return
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        yield from executor.map(fetch, urls)
+
+
+def load_state(path):
+    if not path.exists():
+        return {}
+    with open(path, encoding='utf-8') as file:
+        return json.load(file)
+
+
+def save_state(path, state):
+    path.parent.mkdir(exist_ok=True)
+    part_path = path.with_name(path.name + PART_SUFFIX)
+    with open(part_path, 'w', encoding='utf-8') as file:
+        json.dump(state, file, ensure_ascii=False)
+    part_path.replace(path)
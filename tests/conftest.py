@@ -16,6 +16,8 @@ sys.path.append(str(SRC_DIR))
 
 MAIN_DOC_URL = 'https://docs.python.org/3/'
 PEP_URL = 'https://www.python.org/dev/peps/'
+MAIN_PEP_URL = 'https://peps.python.org/'
+PAGES_DIR = BASE_DIR / 'tests' / 'fixture_data' / 'pages'
 
 
 precode_files = ['constants.py', 'main.py', 'utils.py']
@@ -72,6 +74,48 @@ def mock_session(tempfile_session) -> CachedSession:
     yield mount_mock_adapter(tempfile_session)
 
 
+def get_pages() -> dict:
+    pages = {
+        MAIN_PEP_URL: 'peps_index.html',
+        MAIN_DOC_URL: 'docs_index.html',
+        MAIN_DOC_URL + 'whatsnew/': 'whatsnew_index.html',
+        MAIN_DOC_URL + 'download.html': 'download.html',
+    }
+    for page in PAGES_DIR.glob('pep-*.html'):
+        pages[f'{MAIN_PEP_URL}{page.stem}/'] = page.name
+    for page in PAGES_DIR.glob('whatsnew_*.*.html'):
+        version = page.stem.split('_')[1]
+        pages[f'{MAIN_DOC_URL}whatsnew/{version}.html'] = page.name
+    return pages
+
+
+def get_pages_adapter() -> Adapter:
+    adapter = Adapter()
+    adapter.register_uri(
+        requests_mock.ANY,
+        requests_mock.ANY,
+        content=b'archive',
+        status_code=200,
+    )
+    for url, page in get_pages().items():
+        adapter.register_uri(
+            'GET',
+            url,
+            headers={'Content-Type': 'text/html; charset=utf-8'},
+            content=(PAGES_DIR / page).read_bytes(),
+            status_code=200,
+        )
+    return adapter
+
+
+@pytest.fixture(scope='function')
+def pages_session(tempfile_session) -> CachedSession:
+    adapter = get_pages_adapter()
+    tempfile_session.mount('https://', adapter)
+    tempfile_session.mock_adapter = adapter
+    yield tempfile_session
+
+
 @pytest.fixture
 def response_page(mock_session):
     def _response_page(page):
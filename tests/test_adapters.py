@@ -0,0 +1,168 @@
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+import requests
+try:
+    from src import adapters
+except ModuleNotFoundError:
+    assert False, 'Убедитесь что в директории `src` есть файл `adapters.py`'
+except ImportError:
+    assert False, 'Убедитесь что в директории `src` есть файл `adapters.py`'
+
+
+class FlakyHandler(BaseHTTPRequestHandler):
+    failures = 0
+    delay = 0
+    hits = []
+
+    def do_GET(self):
+        self.hits.append(self.path)
+        time.sleep(self.delay)
+        if len(self.hits) <= self.failures:
+            self.send_response(503)
+            self.send_header('Content-Length', '0')
+            self.end_headers()
+            return
+        body = b'ok'
+        self.send_response(200)
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def flaky_server():
+    FlakyHandler.hits = []
+    server = ThreadingHTTPServer(('127.0.0.1', 0), FlakyHandler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield f'http://127.0.0.1:{server.server_port}'
+    server.shutdown()
+    server.server_close()
+
+
+def make_session(retries, timeout=(1, 1)):
+    session = requests.Session()
+    session.mount('http://', adapters.TimeoutHTTPAdapter(
+        max_retries=adapters.make_retry(retries, 0), timeout=timeout
+    ))
+    return session
+
+
+@pytest.mark.parametrize('failures, retries, completed', [
+    (2, 2, True),
+    (3, 2, False),
+])
+def test_retries(monkeypatch, flaky_server, failures, retries, completed):
+    monkeypatch.setattr(FlakyHandler, 'failures', failures)
+    session = make_session(retries)
+    if completed:
+        assert session.get(f'{flaky_server}/page').text == 'ok', (
+            'Запрос должен повторяться при ответах 5xx'
+        )
+    else:
+        with pytest.raises(requests.RequestException):
+            session.get(f'{flaky_server}/page')
+    assert len(FlakyHandler.hits) == min(failures, retries) + 1
+
+
+def test_default_timeout(monkeypatch, flaky_server):
+    monkeypatch.setattr(FlakyHandler, 'delay', 1)
+    started = time.perf_counter()
+    with pytest.raises(requests.RequestException):
+        make_session(0, timeout=(1, 0.1)).get(f'{flaky_server}/slow')
+    assert time.perf_counter() - started < 0.5, (
+        'Адаптер должен подставлять время ожидания ответа по умолчанию'
+    )
+
+
+def test_backoff_delay():
+    for attempt in range(5):
+        assert 0 <= adapters.backoff_delay(1, attempt) <= 2 ** attempt, (
+            'Пауза между повторами должна расти экспоненциально '
+            'со случайным разбросом'
+        )
+
+
+def test_host_throttle_aimd():
+    throttle = adapters.HostThrottle(max_in_flight=4)
+    for _ in range(20):
+        throttle.acquire()
+        throttle.release(0.1)
+    assert throttle.limit == 4, (
+        'При стабильной задержке число параллельных запросов должно расти '
+        'до размера пула'
+    )
+    throttle.acquire()
+    throttle.release(0.1, throttled=True)
+    assert throttle.limit == 2, 'Ответ 429/503 должен вдвое снижать лимит'
+    throttle.acquire()
+    throttle.release(1.0)
+    assert throttle.limit == 2, 'Медленные ответы не должны повышать лимит'
+
+
+def test_host_throttle_rate_and_retry_after():
+    throttle = adapters.HostThrottle(max_in_flight=1, rate=5)
+    started = time.perf_counter()
+    for _ in range(7):
+        throttle.acquire()
+        throttle.release(0.01)
+    assert time.perf_counter() - started >= 0.35, (
+        'После исчерпания запаса токенов запросы должны выполняться '
+        'не чаще заданной частоты'
+    )
+    throttle = adapters.HostThrottle(max_in_flight=2)
+    throttle.acquire()
+    throttle.release(0.01, throttled=True, retry_after=0.3)
+    started = time.perf_counter()
+    throttle.acquire()
+    assert time.perf_counter() - started >= 0.25, (
+        'Запросы к сайту должны приостанавливаться на время из Retry-After'
+    )
+
+
+def test_throttled_adapter_backs_off(monkeypatch, flaky_server):
+    monkeypatch.setattr(FlakyHandler, 'failures', 1)
+    session = requests.Session()
+    adapter = adapters.ThrottledHTTPAdapter(
+        max_retries=adapters.make_retry(1, 0), pool_maxsize=8
+    )
+    session.mount('http://', adapter)
+    assert session.get(f'{flaky_server}/page').text == 'ok'
+    throttle = adapter.get_throttle(flaky_server)
+    assert throttle.limit == 1, (
+        'Повторы из-за ответов 503 должны снижать число параллельных '
+        'запросов к сайту'
+    )
+
+
+def test_throttled_adapter_releases_on_error(monkeypatch):
+    def broken_send(self, request, **kwargs):
+        raise ValueError('bad header')
+
+    monkeypatch.setattr(adapters.TimeoutHTTPAdapter, 'send', broken_send)
+    adapter = adapters.ThrottledHTTPAdapter(pool_maxsize=2)
+    request = requests.Request('GET', 'http://example.test/').prepare()
+    for _ in range(3):
+        with pytest.raises(ValueError):
+            adapter.send(request)
+    throttle = adapter.get_throttle(request.url)
+    assert throttle.in_flight == 0, (
+        'Любая ошибка отправки запроса должна освобождать место '
+        'в очереди запросов к сайту'
+    )
+    assert throttle.limit == 2, (
+        'Ошибки, не связанные с соединением, не должны снижать число '
+        'параллельных запросов'
+    )
+
+
+def test_retry_after_seconds():
+    assert adapters.retry_after_seconds('3') == 3
+    assert adapters.retry_after_seconds(None) == 0
+    assert adapters.retry_after_seconds('Wed, 21 Oct 2015 07:28:00 GMT') == 0
@@ -0,0 +1,135 @@
+import threading
+from argparse import Namespace
+from datetime import datetime, timezone
+from importlib import import_module
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+from requests_cache import CachedSession
+try:
+    from src import async_utils, cache_storage, utils
+except ModuleNotFoundError:
+    assert False, 'Убедитесь что в директории `src` есть файл `async_utils.py`'
+except ImportError:
+    assert False, 'Убедитесь что в директории `src` есть файл `async_utils.py`'
+
+
+class StandInHandler(BaseHTTPRequestHandler):
+    hits = []
+    etag = '"stand-in"'
+
+    def do_GET(self):
+        self.hits.append(self.path)
+        if self.headers.get('If-None-Match') == self.etag:
+            self.send_response(304)
+            self.send_header('ETag', self.etag)
+            self.end_headers()
+            return
+        body = (
+            f'<html><h1>{self.path}</h1><dl>Editor</dl></html>'
+        ).encode('utf-8')
+        self.send_response(200)
+        self.send_header('Content-Type', 'text/html; charset=utf-8')
+        self.send_header('Content-Length', str(len(body)))
+        self.send_header('ETag', self.etag)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def stand_in_server():
+    StandInHandler.hits = []
+    server = ThreadingHTTPServer(('127.0.0.1', 0), StandInHandler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield f'http://127.0.0.1:{server.server_port}'
+    server.shutdown()
+    server.server_close()
+
+
+def test_crawl_async(tempfile_session, stand_in_server):
+    urls = [f'{stand_in_server}/page/{number}' for number in range(20)]
+    got = list(utils.crawl(
+        tempfile_session, urls, 'whats_new_record',
+        Namespace(workers=5, engine='async')
+    ))
+    assert got == [
+        ((f'/page/{number}', 'Editor'), None) for number in range(20)
+    ], (
+        'Асинхронный движок должен возвращать результаты '
+        'в порядке переданных ссылок'
+    )
+
+
+def test_crawl_async_uses_cache(tempfile_session, stand_in_server):
+    urls = [f'{stand_in_server}/cached/{number}' for number in range(3)]
+    for _ in range(2):
+        async_utils.crawl_async(
+            tempfile_session, urls, 'whats_new_record', Namespace(workers=2)
+        )
+    assert len(StandInHandler.hits) == len(urls), (
+        'Асинхронный движок должен брать уже загруженные страницы из кеша'
+    )
+    response = utils.get_response(tempfile_session, urls[0])
+    assert response.from_cache, (
+        'Страницы, загруженные асинхронным движком, должны быть доступны '
+        'в кеше синхронной сессии'
+    )
+
+
+def test_async_cache_expiration(stand_in_server):
+    session = CachedSession(
+        backend='memory', urls_expire_after={'127.0.0.1*': 60}
+    )
+    url = f'{stand_in_server}/expires/'
+    async_utils.crawl_async(session, [url], 'whats_new_record')
+    cached = session.cache.get_response(
+        async_utils.get_cache_key(session, url)
+    )
+    assert cached.expires is not None, (
+        'Страницы, загруженные асинхронным движком, должны получать '
+        'срок хранения из настроек сессии'
+    )
+    remaining = (
+        cache_storage.as_utc(cached.expires) - datetime.now(timezone.utc)
+    ).total_seconds()
+    assert 0 < remaining <= 60
+
+
+def test_async_cache_revalidation(stand_in_server):
+    session = CachedSession(backend='memory', expire_after=0)
+    url = f'{stand_in_server}/revalidated/'
+    cache_stats = import_module('utils').CACHE_STATS
+    revalidations = cache_stats[utils.CACHE_REVALIDATION]
+    for _ in range(2):
+        got = async_utils.crawl_async(session, [url], 'whats_new_record')
+        assert got == [(('/revalidated/', 'Editor'), None)]
+    assert cache_stats[utils.CACHE_REVALIDATION] == revalidations + 1, (
+        'Устаревшая страница с ETag должна подтверждаться запросом '
+        'If-None-Match, а ответ 304 учитываться как подтверждение'
+    )
+    assert len(StandInHandler.hits) == 2
+
+
+def test_async_cache_disabled(tempfile_session, stand_in_server):
+    url = f'{stand_in_server}/disabled/'
+    async_utils.crawl_async(tempfile_session, [url], 'whats_new_record')
+    with tempfile_session.cache_disabled():
+        async_utils.crawl_async(tempfile_session, [url], 'whats_new_record')
+    assert len(StandInHandler.hits) == 2, (
+        'Асинхронный движок не должен читать кеш, когда он отключён'
+    )
+
+
+def test_crawl_async_connection_error(tempfile_session, stand_in_server):
+    got = async_utils.crawl_async(
+        tempfile_session, ['http://127.0.0.1:1/'], 'whats_new_record'
+    )
+    record, error = got[0]
+    assert record is None and error is not None, (
+        'Ошибки соединения должны возвращаться вместе с результатами, '
+        'а не прерывать обход страниц'
+    )
@@ -0,0 +1,110 @@
+from argparse import Namespace
+
+import pytest
+try:
+    from src import constants, main, utils
+except ModuleNotFoundError:
+    assert False, 'Убедитесь что в директории `src` есть файл `main.py`'
+except ImportError:
+    assert False, 'Убедитесь что в директории `src` есть файл `main.py`'
+
+
+BACKENDS = ['soup', 'lxml']
+
+
+def run_mode(session, mode, backend, decode_text=False):
+    return list(main.MODE_TO_FUNCTION[mode](
+        session,
+        Namespace(backend=backend, workers=1, decode_text=decode_text)
+    ))
+
+
+@pytest.mark.parametrize('mode', ['whats-new', 'latest-versions', 'pep'])
+@pytest.mark.parametrize('decode_text', [False, True])
+def test_backends_parity(pages_session, mode, decode_text):
+    soup_result, lxml_result = (
+        run_mode(pages_session, mode, backend, decode_text)
+        for backend in BACKENDS
+    )
+    assert soup_result == lxml_result, (
+        f'Режим {mode} должен возвращать одинаковые результаты '
+        'для всех библиотек извлечения данных'
+    )
+    assert soup_result == run_mode(
+        pages_session, mode, 'soup', not decode_text
+    ), (
+        f'Режим {mode} должен возвращать одинаковые результаты '
+        'при разборе байтов и декодированного текста'
+    )
+
+
+@pytest.mark.parametrize('extract, url', [
+    ('archive_links', 'https://docs.python.org/3/download.html'),
+    ('pep_rows', 'https://peps.python.org/'),
+    ('whats_new_links', 'https://docs.python.org/3/whatsnew/'),
+])
+def test_backends_extract_parity(pages_session, extract, url):
+    got = [
+        getattr(utils.get_backend(cli_args), extract)(
+            utils.get_document(pages_session, url, cli_args)
+        )
+        for cli_args in (Namespace(backend=name) for name in BACKENDS)
+    ]
+    assert got[0] and got[0] == got[1], (
+        f'Функция `{extract}` должна извлекать одинаковые данные '
+        'во всех библиотеках'
+    )
+
+
+@pytest.mark.parametrize('backend', BACKENDS)
+def test_backend_find_tag_exception(pages_session, backend):
+    cli_args = Namespace(backend=backend)
+    document = utils.get_document(
+        pages_session, 'https://docs.python.org/3/', cli_args
+    )
+    backend = utils.get_backend(cli_args)
+    with pytest.raises(BaseException) as excinfo:
+        backend.pep_status(document)
+    assert excinfo.typename == 'ParserFindTagException'
+
+
+@pytest.mark.parametrize('backend', BACKENDS)
+@pytest.mark.parametrize('url, extract, scope', [
+    (
+        'https://peps.python.org/pep-0008/', 'pep_status',
+        constants.PEP_CARD_SCOPE
+    ),
+    (
+        'https://docs.python.org/3/whatsnew/3.12.html', 'whats_new_record',
+        constants.WHATS_NEW_SCOPE
+    ),
+])
+def test_extract_record_plain(pages_session, backend, url, extract, scope):
+    response = pages_session.get(url)
+    (record, error), _ = utils.extract_record(
+        response.content, 'utf-8', extract, Namespace(backend=backend), scope
+    )
+    values = record if isinstance(record, tuple) else (record,)
+    assert error is None and all(type(value) is str for value in values), (
+        'Записи из процессов разбора должны быть обычными строками '
+        'и кортежами, а не узлами дерева страницы'
+    )
+
+
+NESTED_STATUS_CARD = (
+    '<html><body><dl class="rfc2822 field-list simple">'
+    '<dt>Status:</dt>\n<dd><abbr title="Принят">Acc</abbr>epted</dd>'
+    '</dl></body></html>'
+).encode('utf-8')
+
+
+@pytest.mark.parametrize('backend', BACKENDS)
+def test_pep_status_nested_markup(backend):
+    (status, error), _ = utils.extract_record(
+        NESTED_STATUS_CARD, 'utf-8', 'pep_status',
+        Namespace(backend=backend), constants.PEP_CARD_SCOPE
+    )
+    assert error is None and status == 'Accepted', (
+        'Статус из ячейки с вложенной разметкой должен извлекаться '
+        'целиком, а не превращаться в строку `None`'
+    )
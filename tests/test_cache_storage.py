@@ -0,0 +1,161 @@
+import zlib
+from argparse import Namespace
+from datetime import datetime, timedelta
+
+import pytest
+try:
+    from src import cache_storage, commands, configs, utils
+except ModuleNotFoundError:
+    assert False, (
+        'Убедитесь что в директории `src` есть файл `cache_storage.py`'
+    )
+except ImportError:
+    assert False, (
+        'Убедитесь что в директории `src` есть файл `cache_storage.py`'
+    )
+
+from conftest import MAIN_PEP_URL, get_pages_adapter
+
+PAGES = [f'{MAIN_PEP_URL}pep-{number:04}/' for number in (1, 8, 20)]
+
+
+def cached_sizes(session):
+    return {
+        key: size for key, size, _, _ in cache_storage.cache_entries(session)
+    }
+
+
+def test_prune_cache_evicts_least_recently_used(pages_session):
+    for url in PAGES:
+        pages_session.get(url)
+    keys = list(cached_sizes(pages_session))
+    sizes = cached_sizes(pages_session)
+    max_size = sum(sizes.values()) - 1
+    count, freed = cache_storage.prune_cache(
+        pages_session, max_size, recent_keys=keys[:1]
+    )
+    assert (count, freed) == (1, sizes[keys[1]]), (
+        'Сначала должна удаляться самая давно сохранённая страница, '
+        'не использованная в текущем запуске'
+    )
+    assert set(cached_sizes(pages_session)) == {keys[0], keys[2]}
+
+
+@pytest.mark.parametrize('cache_backend', ['sqlite', 'filesystem'])
+def test_prune_cache_uses_access_times(tmp_path, cache_backend):
+    parser = configs.configure_argument_parser(['cache-prune'])
+    args = parser.parse_args([
+        'cache-prune', '--cache-dir', str(tmp_path),
+        '--cache-backend', cache_backend
+    ])
+    session = configs.configure_session(args)
+    session.mount('https://', get_pages_adapter())
+    for url in [*PAGES, PAGES[0]]:
+        utils.get_response(session, url)
+    sizes = cached_sizes(session)
+    keys = [utils.get_cache_key(session, url) for url in PAGES]
+    session = configs.configure_session(args)
+    count, freed = cache_storage.prune_cache(
+        session, sum(sizes.values()) - 1
+    )
+    assert (count, freed) == (1, sizes[keys[1]]), (
+        'Сначала должна удаляться страница, которую дольше всех не читали, '
+        'даже если она сохранена позже других'
+    )
+    assert set(cache_storage.access_times(session.cache).keys()) == {
+        keys[0], keys[2]
+    }, 'Время чтения удалённых страниц не должно храниться'
+
+
+def test_prune_cache_expired(pages_session):
+    pages_session.get(PAGES[0])
+    stale = pages_session.get(PAGES[1])
+    pages_session.cache.save_response(
+        stale, stale.cache_key, datetime.utcnow() - timedelta(hours=1)
+    )
+    assert cache_storage.prune_cache(pages_session)[0] == 0, (
+        'Без ограничения размера и флага expired кеш не должен меняться'
+    )
+    count, _ = cache_storage.prune_cache(pages_session, expired=True)
+    assert count == 1, 'Очистка должна удалять устаревшие страницы'
+
+
+def test_cache_stats(pages_session):
+    for url in PAGES:
+        pages_session.get(url)
+    got = dict(list(commands.cache_stats(
+        pages_session, Namespace(cache_backend='memory')
+    ))[1:])
+    assert got['Хранилище'] == 'memory'
+    assert got['Страниц'] == len(PAGES)
+    assert got['Самая старая запись'], (
+        'Статистика кеша должна показывать время самой старой записи'
+    )
+
+
+@pytest.mark.parametrize('backend, cache_file', [
+    ('sqlite', 'http_cache.sqlite'),
+    ('filesystem', 'http_cache'),
+])
+def test_configure_session_cache_dir(tmp_path, backend, cache_file):
+    args = configs.configure_argument_parser(['pep']).parse_args(
+        ['pep', '--cache-backend', backend, '--cache-dir', str(tmp_path)]
+    )
+    session = configs.configure_session(args)
+    assert (tmp_path / cache_file).exists(), (
+        'Кеш должен создаваться в каталоге из --cache-dir'
+    )
+    if backend == 'sqlite':
+        with session.cache.responses.connection() as connection:
+            mode = connection.execute('PRAGMA journal_mode').fetchone()[0]
+        assert mode == 'wal', 'SQLite-кеш должен работать в режиме WAL'
+
+
+def test_compressed_cache(tmp_path):
+    args = configs.configure_argument_parser(['pep']).parse_args(
+        ['pep', '--cache-dir', str(tmp_path), '--cache-compression', '6']
+    )
+    session = configs.configure_session(args)
+    session.mount('https://', get_pages_adapter())
+    body = session.get(PAGES[0]).content
+    response = utils.get_response(session, PAGES[0])
+    assert response.from_cache and response.content == body, (
+        'Сжатие кеша должно быть незаметно при чтении страниц'
+    )
+    with session.cache.responses.connection() as connection:
+        stored = connection.execute(
+            'SELECT value FROM responses'
+        ).fetchone()[0]
+    assert len(stored) < len(body) and zlib.decompress(stored), (
+        'Страницы в кеше должны храниться сжатыми'
+    )
+
+
+def test_compressed_cache_sizes(tmp_path):
+    args = configs.configure_argument_parser(['pep']).parse_args(
+        ['pep', '--cache-dir', str(tmp_path), '--cache-compression', '6']
+    )
+    session = configs.configure_session(args)
+    session.mount('https://', get_pages_adapter())
+    body = session.get(PAGES[0]).content
+    [(_, size, _, _)] = cache_storage.cache_entries(session)
+    assert size < len(body), (
+        'Размер кеша должен считаться по сохранённым (сжатым) данным'
+    )
+
+
+def test_cache_compression_switched(tmp_path):
+    options = ['pep', '--cache-dir', str(tmp_path)]
+    parser = configs.configure_argument_parser(['pep'])
+    session = configs.configure_session(
+        parser.parse_args([*options, '--cache-compression', '6'])
+    )
+    session.mount('https://', get_pages_adapter())
+    session.get(PAGES[0])
+    session = configs.configure_session(parser.parse_args(options))
+    summary = cache_storage.cache_summary(session)
+    assert (summary['entries'], summary['expired']) == (1, 1), (
+        'Записи, сохранённые с другим сжатием, должны считаться устаревшими'
+    )
+    assert cache_storage.prune_cache(session, expired=True)[0] == 1
+    assert cache_storage.cache_summary(session)['entries'] == 0
@@ -29,7 +29,7 @@ def test_configs_file():
     ),
     (
         argparse._StoreAction, ['-o', '--output'], 'output',
-        ('pretty', 'file'),
+        ('pretty', 'file', 'sqlite', 'jsonl'),
         'Дополнительные способы вывода данных'
     ),
 ])
@@ -64,3 +64,25 @@ def test_configure_argument_parser(
     assert got_action.help == help_str, (
         f'Укажите help-строку cli аргумента {got_action.dest}'
     )
+
+
+def test_url_expiration():
+    assert configs.url_expiration('peps.python.org/pep-=600') == (
+        'peps.python.org/pep-', 600
+    )
+    with pytest.raises(argparse.ArgumentTypeError):
+        configs.url_expiration('peps.python.org')
+
+
+def test_mode_interval():
+    assert configs.mode_interval('pep=3600') == ('pep', 3600)
+    for value in ('pep', 'pep=0', '=60'):
+        with pytest.raises(argparse.ArgumentTypeError):
+            configs.mode_interval(value)
+
+
+def test_shard_spec():
+    assert configs.shard_spec('2/4') == (2, 4)
+    for value in ('0/4', '5/4', '2', 'a/4'):
+        with pytest.raises(argparse.ArgumentTypeError):
+            configs.shard_spec(value)
@@ -1,4 +1,11 @@
+import json
+import re
 import pytest
+import subprocess
+import sys
+from argparse import Namespace
+from importlib import import_module
+from types import GeneratorType
 from pathlib import Path
 try:
     from src import main
@@ -33,9 +40,10 @@ def test_main_file():
 def test_whats_new(mock_session):
     got = main.whats_new(mock_session)
     header = ('Ссылка на статью', 'Заголовок', 'Редактор, Автор')
-    assert isinstance(got, list), (
-        'Функция `whats_new` должна возвращать объект типа `list`'
+    assert isinstance(got, GeneratorType), (
+        'Функция `whats_new` должна возвращать генератор строк результата'
     )
+    got = list(got)
     assert len(got) > 0, (
         'Убедитесь что функция `whats_new` модуля `main.py` '
         'возвращает непустой список'
@@ -54,9 +62,10 @@ def test_whats_new(mock_session):
 @pytest.mark.skip()
 def test_latest_versions(mock_session):
     got = main.latest_versions(mock_session)
-    assert isinstance(got, list), (
-        'Функция `latest_versions` должна возвращать объект типа `list`'
+    assert isinstance(got, GeneratorType), (
+        'Функция `latest_versions` должна возвращать генератор строк'
     )
+    got = list(got)
     assert isinstance(got[0], tuple), (
         'Функция `latest_versions` должна вернуть список `result`, '
         'элементами которого должны быть объекты типа `tuple`'
@@ -88,7 +97,7 @@ def test_latest_versions(mock_session):
 
 def test_download(monkeypatch, tmp_path, mock_session):
     mock_base_dir = Path(tmp_path)
-    monkeypatch.setattr(main, 'BASE_DIR', mock_base_dir)
+    monkeypatch.setattr(import_module('modes'), 'BASE_DIR', mock_base_dir)
     got = main.download(mock_session)
     dirs = [
         directory for directory in mock_base_dir.iterdir()
@@ -140,3 +149,204 @@ def test_mode_to_function():
             'В модуле `main.py` в объекте `MODE_TO_FUNCTION` '
             f'нет значения {func}'
         )
+
+
+PEP_RESULT = [
+    ('Статус', 'Количество'),
+    ('Active', 3),
+    ('Final', 4),
+    ('Rejected', 1),
+    ('April Fool!', 1),
+    ('Withdrawn', 1),
+    ('Accepted', 1),
+    ('Всего', 11),
+]
+
+
+@pytest.mark.parametrize('cli_args', [
+    None,
+    Namespace(workers=4, engine='threads'),
+    Namespace(workers=2, parse_processes=2, backend='lxml'),
+    Namespace(workers=4, stream_cards=True),
+    Namespace(workers=2, parse_processes=2, stream_cards=True),
+])
+def test_pep_offline(pages_session, cli_args):
+    got = list(main.pep(pages_session, cli_args))
+    assert got == PEP_RESULT, (
+        'Функция `pep` должна подсчитывать статусы из карточек PEP'
+    )
+
+
+@pytest.mark.parametrize('cli_args', [
+    None,
+    Namespace(workers=3, engine='threads'),
+    Namespace(workers=1, parse_processes=2),
+])
+def test_whats_new_offline(pages_session, cli_args):
+    got = list(main.whats_new(pages_session, cli_args))
+    assert len(got) == 6
+    assert got[1] == (
+        'https://docs.python.org/3/whatsnew/3.12.html',
+        'What’s New In Python 3.12¶',
+        ' Editor: Adam Turner  '
+    )
+
+
+@pytest.mark.parametrize('mode', ['whats-new', 'pep'])
+def test_progress_bar_completes(capsys, pages_session, mode):
+    list(main.MODE_TO_FUNCTION[mode](pages_session))
+    done, total = re.findall(r'(\d+)/(\d+)', capsys.readouterr().err)[-1]
+    assert done == total, (
+        'Индикатор прогресса должен доходить до общего числа страниц'
+    )
+
+
+def test_latest_versions_offline(pages_session):
+    got = list(main.latest_versions(pages_session))
+    assert got[1] == ('https://docs.python.org/3.13/', '3.13', 'in development')
+    assert got[-1] == (
+        'https://www.python.org/doc/versions/', 'All versions', ''
+    )
+
+
+def test_pep_incremental(monkeypatch, tmp_path, pages_session):
+    monkeypatch.setattr(import_module('modes'), 'BASE_DIR', Path(tmp_path))
+    cli_args = Namespace(incremental=True, max_age=3600)
+    adapter = pages_session.mock_adapter
+    assert list(main.pep(pages_session, cli_args)) == PEP_RESULT
+    assert (tmp_path / 'state' / 'pep.json').exists(), (
+        'Инкрементальный режим `pep` должен сохранять состояние '
+        'в директории `state`'
+    )
+    pages_session.cache.clear()
+    requests_before = adapter.call_count
+    assert list(main.pep(pages_session, cli_args)) == PEP_RESULT, (
+        'Инкрементальный режим `pep` должен давать ту же сводку, '
+        'что и полный обход'
+    )
+    assert adapter.call_count - requests_before == 1, (
+        'При неизменившемся индексе должна загружаться только '
+        'страница индекса'
+    )
+    pages_session.cache.clear()
+    requests_before = adapter.call_count
+    list(main.pep(pages_session, Namespace(incremental=True, max_age=0)))
+    assert adapter.call_count - requests_before == 13, (
+        'Устаревшие записи состояния должны загружаться заново'
+    )
+
+
+def test_pep_incremental_fingerprint(monkeypatch, tmp_path, pages_session):
+    monkeypatch.setattr(import_module('modes'), 'BASE_DIR', Path(tmp_path))
+    cli_args = Namespace(incremental=True, max_age=3600)
+    list(main.pep(pages_session, cli_args))
+    state_path = tmp_path / 'state' / 'pep.json'
+    url = 'https://peps.python.org/pep-0008/'
+    fingerprint = json.loads(state_path.read_text())[url]['fingerprint']
+    assert fingerprint, 'Состояние должно хранить отпечаток карточки PEP'
+    page = pages_session.get(url).content
+    pages_session.mock_adapter.register_uri(
+        'GET', url, content=page + b'<!-- changed -->',
+        headers={'Content-Type': 'text/html; charset=utf-8'}
+    )
+    pages_session.get(url, force_refresh=True)
+    assert list(main.pep(pages_session, cli_args)) == PEP_RESULT
+    assert json.loads(
+        state_path.read_text()
+    )[url]['fingerprint'] != fingerprint, (
+        'Карточка, изменившаяся в кеше, должна разбираться заново '
+        'раньше срока --max-age'
+    )
+
+
+def test_pep_skips_fingerprints(monkeypatch, pages_session):
+    fingerprinted = []
+    monkeypatch.setattr(
+        import_module('modes'), 'cached_fingerprint',
+        lambda session, url: fingerprinted.append(url)
+    )
+    assert list(main.pep(pages_session, Namespace())) == PEP_RESULT
+    assert fingerprinted == [], (
+        'Без --incremental отпечатки карточек PEP не должны вычисляться'
+    )
+
+
+HEAVY_MODULES = ('requests', 'requests_cache', 'bs4', 'tqdm', 'prettytable')
+
+
+def test_help_skips_heavy_imports():
+    src_dir = Path(main.__file__).parent
+    got = subprocess.run(
+        [
+            sys.executable, '-c',
+            'import sys\n'
+            'import main\n'
+            'sys.argv = ["main.py", "-h"]\n'
+            'try:\n'
+            '    main.main()\n'
+            'except SystemExit:\n'
+            '    pass\n'
+            f'print(*sorted(set({HEAVY_MODULES!r}) & set(sys.modules)))\n'
+        ],
+        cwd=src_dir,
+        capture_output=True,
+        text=True,
+        check=True
+    )
+    assert got.stdout.splitlines()[-1] == '', (
+        'Вызов справки не должен загружать библиотеки режимов и вывода: '
+        f'{got.stdout.splitlines()[-1]}'
+    )
+
+
+MODE_MODULES = ('bs4', 'lxml', 'tqdm', 'prettytable')
+
+
+@pytest.mark.parametrize('arguments', [
+    ['cache-stats', '--cache-backend', 'memory'],
+    ['merge', '--cache-backend', 'memory'],
+])
+def test_commands_skip_mode_imports(arguments):
+    got = subprocess.run(
+        [
+            sys.executable, '-c',
+            'import sys\n'
+            'import main\n'
+            f'sys.argv = ["main.py", *{arguments!r}]\n'
+            'main.main()\n'
+            f'print(*sorted(set({MODE_MODULES!r}) & set(sys.modules)))\n'
+        ],
+        cwd=Path(main.__file__).parent,
+        capture_output=True,
+        text=True,
+        check=True
+    )
+    assert got.stdout.splitlines()[-1] == '', (
+        'Команды без обхода страниц не должны загружать библиотеки '
+        f'разбора и вывода: {got.stdout.splitlines()[-1]}'
+    )
+
+
+def test_selected_modes():
+    assert main.selected_modes(['pep', 'all', 'pep']) == [
+        'pep', 'whats-new', 'latest-versions', 'download'
+    ], 'Режим `all` должен разворачиваться во все режимы без повторов'
+
+
+def test_run_modes_output_each_mode(capsys, pages_session):
+    cli_args = Namespace(mode=['latest-versions', 'pep'], output=None)
+    modes = main.selected_modes(['latest-versions', 'pep', 'latest-versions'])
+    with pages_session.cache_disabled():
+        main.run_modes(pages_session, cli_args, modes)
+    captured_out, _ = capsys.readouterr()
+    assert captured_out.count('Ссылка на документацию Версия Статус') == 1
+    assert 'Всего {}'.format(PEP_RESULT[-1][1]) in captured_out, (
+        'Результаты каждого режима должны выводиться отдельно'
+    )
+    assert cli_args.mode == ['latest-versions', 'pep']
+    requested = [
+        request.url for request in pages_session.mock_adapter.request_history
+    ]
+    assert len(requested) == len(set(requested)), (
+        'За один запуск режимов каждая страница должна загружаться один раз'
+    )
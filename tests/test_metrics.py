@@ -0,0 +1,71 @@
+import json
+from argparse import Namespace
+
+import pytest
+
+try:
+    from src import main
+except ModuleNotFoundError:
+    assert False, 'Убедитесь что в директории `src` есть файл `main.py`'
+except ImportError:
+    assert False, 'Убедитесь что в директории `src` есть файл `main.py`'
+
+metrics = main.metrics
+
+
+@pytest.fixture
+def clean_metrics():
+    metrics.reset()
+    yield metrics
+    metrics.reset()
+    metrics.set_mode(None)
+
+
+@pytest.mark.parametrize('cli_args', [
+    None,
+    Namespace(workers=2, parse_processes=2),
+])
+def test_phases_per_mode(clean_metrics, pages_session, cli_args):
+    clean_metrics.set_mode('pep')
+    list(main.pep(pages_session, cli_args))
+    summary = clean_metrics.summarize()
+    assert set(summary) == {'pep'}, (
+        'Метрики должны собираться под именем текущего режима'
+    )
+    phases = summary['pep']['phases']
+    assert {'network', 'parse', 'extract'} <= set(phases), (
+        'Должно измеряться время загрузки, разбора и извлечения данных'
+    )
+    assert phases['extract']['count'] == 12, (
+        'Время извлечения должно измеряться для каждой карточки PEP, '
+        'в том числе в процессах разбора'
+    )
+    for stats in phases.values():
+        assert stats['p50'] <= stats['p95'] <= stats['max']
+    counters = summary['pep']['counters']
+    assert counters['bytes'] > 0
+    assert counters['cache_misses'] == 13
+
+
+def test_export(clean_metrics, tmp_path):
+    clean_metrics.set_mode('whats-new')
+    for seconds in (0.1, 0.2, 0.3, 0.4):
+        clean_metrics.observe('network', seconds)
+    clean_metrics.increment('bytes', 2048)
+    clean_metrics.export(tmp_path)
+    summary = json.loads((tmp_path / 'metrics.json').read_text('utf-8'))
+    assert summary['whats-new']['phases']['network'] == {
+        'count': 4, 'sum': pytest.approx(1.0),
+        'p50': 0.3, 'p95': 0.4, 'max': 0.4
+    }
+    prom = (tmp_path / 'metrics.prom').read_text('utf-8')
+    for line in (
+        '# TYPE bs4_parser_phase_seconds summary',
+        'bs4_parser_phase_seconds{mode="whats-new",phase="network",'
+        'quantile="0.95"} 0.4',
+        'bs4_parser_phase_seconds_count{mode="whats-new",phase="network"} 4',
+        'bs4_parser_bytes_total{mode="whats-new"} 2048',
+    ):
+        assert line in prom.splitlines(), (
+            f'В файле для Prometheus нет строки {line}'
+        )
@@ -1,4 +1,7 @@
+import json
+import sqlite3
 from datetime import datetime
+from importlib import import_module
 from typing import Optional
 from pathlib import Path
 import pytest
@@ -53,7 +56,7 @@ def test_control_output_pretty(capsys, records, cli_arg, part_output):
 ])
 def test_control_output_file(monkeypatch, tmp_path, records, cli_arg):
     mock_base_dir = Path(tmp_path)
-    monkeypatch.setattr(outputs, 'BASE_DIR', mock_base_dir)
+    monkeypatch.setattr(import_module('outputs'), 'BASE_DIR', mock_base_dir)
 
     records = records(cli_arg.mode)
     outputs.control_output(records, cli_arg)
@@ -90,3 +93,60 @@ def test_output_file():
     assert hasattr(outputs, 'file_output'), (
         'Напишите функцию `file_output` в модуле `output.py`'
     )
+
+
+def test_file_output_streaming(monkeypatch, tmp_path):
+    monkeypatch.setattr(import_module('outputs'), 'BASE_DIR', Path(tmp_path))
+
+    def interrupted_rows():
+        yield ('Статус', 'Количество')
+        yield ('Active', 1)
+        raise ConnectionError('crawl died')
+
+    with pytest.raises(ConnectionError):
+        outputs.control_output(interrupted_rows(), cli_args('pep', 'file'))
+    output_file, = (tmp_path / 'results').glob('*.csv')
+    assert output_file.read_text(encoding='utf-8').splitlines() == [
+        '"Статус","Количество"', '"Active","1"'
+    ], (
+        'Функция `file_output` должна записывать строки по мере их '
+        'получения, чтобы частичный результат сохранялся на диске'
+    )
+
+
+def test_control_output_sqlite(monkeypatch, tmp_path, records):
+    tables = import_module('tables')
+    monkeypatch.setattr(tables, 'BASE_DIR', Path(tmp_path))
+    monkeypatch.setattr(tables, 'SQLITE_BATCH_SIZE', 2)
+    rows = records('whats-new')
+    for _ in range(2):
+        outputs.control_output(iter(rows), cli_args('whats-new', 'sqlite'))
+    connection = sqlite3.connect(tmp_path / 'results' / 'results.sqlite3')
+    got = connection.execute(
+        'SELECT * FROM whats_new ORDER BY rowid'
+    ).fetchall()
+    columns = [
+        column[1] for column in
+        connection.execute('PRAGMA table_info(whats_new)')
+    ]
+    connection.close()
+    assert columns == ['run_at', *rows[0]], (
+        'Таблица режима должна содержать время запуска и колонки заголовка'
+    )
+    assert [row[1:] for row in got] == rows[1:] * 2, (
+        'Каждый запуск должен добавлять строки результата в таблицу режима'
+    )
+
+
+def test_control_output_jsonl(monkeypatch, tmp_path, records):
+    monkeypatch.setattr(import_module('outputs'), 'BASE_DIR', Path(tmp_path))
+    rows = records('latest-versions')
+    outputs.control_output(iter(rows), cli_args('latest-versions', 'jsonl'))
+    output_file, = (tmp_path / 'results').glob('*.jsonl')
+    got = [
+        json.loads(line)
+        for line in output_file.read_text(encoding='utf-8').splitlines()
+    ]
+    assert got == [dict(zip(rows[0], row)) for row in rows[1:]], (
+        'Вывод `jsonl` должен содержать по одному объекту на строку'
+    )
@@ -0,0 +1,97 @@
+import sys
+import time
+from argparse import Namespace
+from importlib import import_module
+
+try:
+    from src import commands, main, scheduler
+except ModuleNotFoundError:
+    assert False, 'Убедитесь что в директории `src` есть файл `scheduler.py`'
+except ImportError:
+    assert False, 'Убедитесь что в директории `src` есть файл `scheduler.py`'
+
+
+def test_output_only_when_changed(capsys, pages_session):
+    versions = ['3.12']
+
+    def releases(session, cli_args):
+        yield ('Версия',)
+        yield from ((version,) for version in versions)
+
+    watcher = scheduler.Scheduler(
+        pages_session,
+        Namespace(output=None),
+        {'releases': releases, 'latest-versions': main.latest_versions},
+        {'releases': 60, 'latest-versions': 60},
+        jitter=0
+    )
+    assert sorted(watcher.run_pending(float('inf'))) == [
+        'latest-versions', 'releases'
+    ]
+    assert '3.12' in capsys.readouterr().out
+    watcher.run_pending(float('inf'))
+    assert capsys.readouterr().out == '', (
+        'Неизменившиеся результаты не должны выводиться повторно'
+    )
+    versions.append('3.13')
+    watcher.run_pending(float('inf'))
+    assert capsys.readouterr().out == 'Версия\n3.12\n3.13\n', (
+        'Изменившиеся результаты должны выводиться'
+    )
+
+
+def test_jittered_schedule(pages_session):
+    watcher = scheduler.Scheduler(
+        pages_session,
+        Namespace(),
+        {},
+        {'pep': 100, 'whats-new': 1000},
+        jitter=0.1
+    )
+    now = time.monotonic()
+    starts = dict((mode, start) for start, mode in watcher.queue)
+    assert starts['pep'] - now <= 10 and starts['whats-new'] - now <= 100, (
+        'Первый запуск режимов должен быть разнесён не дальше '
+        'доли --jitter от периода'
+    )
+    delays = [watcher.next_delay('pep') for _ in range(50)]
+    assert all(90 <= delay <= 110 for delay in delays)
+    assert len(set(delays)) > 1, 'Период обновления должен иметь разброс'
+    assert watcher.run_pending(now - 1) == []
+
+
+def test_records_reused_across_cycles(monkeypatch, pages_session):
+    utils = sys.modules[scheduler.shared_records.__module__]
+    parsed = []
+    parse_content = utils.parse_content
+
+    def counting_parse(*args, **kwargs):
+        parsed.append(args[0])
+        return parse_content(*args, **kwargs)
+
+    monkeypatch.setattr(utils, 'parse_content', counting_parse)
+    watcher = scheduler.Scheduler(
+        pages_session, Namespace(output=None), main.MODE_TO_FUNCTION,
+        {'pep': 60}, jitter=0
+    )
+    with scheduler.shared_records():
+        watcher.run_pending(float('inf'))
+        first_cycle = len(parsed)
+        watcher.run_pending(float('inf'))
+    assert len(parsed) - first_cycle == 1, (
+        'Между циклами watch неизменившиеся карточки PEP '
+        'не должны разбираться заново'
+    )
+
+
+def test_watch_positional_modes(monkeypatch):
+    watched = {}
+    top_scheduler = import_module('scheduler')
+    monkeypatch.setattr(
+        top_scheduler.Scheduler, 'run_forever',
+        lambda self: watched.update(self.intervals)
+    )
+    commands.watch(None, Namespace(interval=[], watch_modes=['pep'], jitter=0))
+    assert list(watched) == ['pep'], (
+        'Режимы, указанные вместе с watch, должны обновляться по расписанию'
+    )
@@ -0,0 +1,119 @@
+import threading
+import time
+from argparse import Namespace
+from concurrent.futures import ThreadPoolExecutor
+from importlib import import_module
+
+import pytest
+import requests
+try:
+    from src import modes, server
+except ModuleNotFoundError:
+    assert False, 'Убедитесь что в директории `src` есть файл `server.py`'
+except ImportError:
+    assert False, 'Убедитесь что в директории `src` есть файл `server.py`'
+
+
+def counting_modes(calls, delay=0):
+    def counted(mode):
+        def run(session, cli_args):
+            calls.append(mode)
+            time.sleep(delay)
+            return modes.SERVED_MODES[mode](session, cli_args)
+        return run
+    return {mode: counted(mode) for mode in modes.SERVED_MODES}
+
+
+@pytest.fixture
+def result_server(pages_session):
+    calls = []
+    store = server.ResultStore(
+        pages_session, Namespace(), counting_modes(calls), ttl=600
+    )
+    http_server = server.make_server(store, '127.0.0.1', 0)
+    thread = threading.Thread(target=http_server.serve_forever, daemon=True)
+    thread.start()
+    yield f'http://127.0.0.1:{http_server.server_port}', calls
+    http_server.shutdown()
+    http_server.server_close()
+    store.close()
+
+
+def test_serve_modes(result_server):
+    url, calls = result_server
+    assert requests.get(url).json() == {
+        'modes': ['whats-new', 'latest-versions', 'pep']
+    }
+    first = requests.get(f'{url}/pep').json()
+    second = requests.get(f'{url}/pep').json()
+    assert first['header'] == ['Статус', 'Количество']
+    assert first['rows'] == second['rows'], (
+        'Повторный запрос должен возвращать те же результаты'
+    )
+    assert calls == ['pep'], (
+        'Повторный запрос в пределах --ttl должен отвечать из памяти'
+    )
+    assert requests.get(f'{url}/download').status_code == 404
+
+
+def test_concurrent_requests_single_flight(pages_session):
+    calls = []
+    store = server.ResultStore(
+        pages_session, Namespace(), counting_modes(calls, delay=0.2), ttl=600
+    )
+    with ThreadPoolExecutor(max_workers=8) as executor:
+        results = list(executor.map(
+            lambda _: store.get('latest-versions')[0], range(8)
+        ))
+    store.close()
+    assert calls == ['latest-versions'], (
+        'Одновременные одинаковые запросы должны объединяться '
+        'в одно вычисление'
+    )
+    assert all(rows == results[0] for rows in results)
+
+
+def test_stale_results_refresh_in_background(pages_session):
+    calls = []
+    store = server.ResultStore(
+        pages_session, Namespace(), counting_modes(calls, delay=0.2), ttl=0
+    )
+    rows, _ = store.get('latest-versions')
+    started = time.perf_counter()
+    stale_rows, age = store.get('latest-versions')
+    assert time.perf_counter() - started < 0.1, (
+        'Устаревшие результаты должны отдаваться сразу, '
+        'а обновляться в фоне'
+    )
+    assert stale_rows == rows and age >= 0
+    store.pending['latest-versions'].result()
+    assert calls == ['latest-versions'] * 2
+    store.close()
+
+
+def test_serve_shares_records(monkeypatch, pages_session):
+    memo_states = import_module('utils')
+    served = {}
+
+    class StubServer:
+        server_port = 0
+
+        def serve_forever(self):
+            served.update(
+                pages=memo_states.PAGE_MEMO_STATE['enabled'],
+                records=memo_states.RECORD_MEMO_STATE['enabled']
+            )
+
+        def server_close(self):
+            pass
+
+    monkeypatch.setattr(server, 'make_server', lambda *args: StubServer())
+    server.serve(
+        server.ResultStore(pages_session, Namespace(), {}, ttl=60),
+        '127.0.0.1',
+        0
+    )
+    assert served == {'pages': True, 'records': True}, (
+        'Сервер должен переиспользовать разобранные страницы '
+        'и извлечённые записи между обновлениями'
+    )
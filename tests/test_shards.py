@@ -0,0 +1,51 @@
+from argparse import Namespace
+
+import pytest
+try:
+    from src import main, modes, shards
+except ModuleNotFoundError:
+    assert False, 'Убедитесь что в директории `src` есть файл `shards.py`'
+except ImportError:
+    assert False, 'Убедитесь что в директории `src` есть файл `shards.py`'
+
+SHARDS = 3
+
+
+def run_shards(session, mode, shard_dir, count=SHARDS):
+    return [
+        list(main.MODE_TO_FUNCTION[mode](session, Namespace(
+            mode=mode, shard=(index, count), shard_dir=shard_dir
+        )))[1:]
+        for index in range(1, count + 1)
+    ]
+
+
+@pytest.mark.parametrize('mode', ['whats-new', 'pep'])
+def test_merge_shards(pages_session, tmp_path, mode):
+    expected = list(main.MODE_TO_FUNCTION[mode](pages_session))
+    run_shards(pages_session, mode, tmp_path)
+    parts = shards.load(Namespace(shard_dir=tmp_path), mode)
+    assert len(parts) == SHARDS
+    assert list(shards.MERGE_FUNCTIONS[mode](parts)) == expected, (
+        'Объединённые частичные результаты должны совпадать '
+        'с результатом режима без разбиения'
+    )
+
+
+def test_shards_are_disjoint(pages_session, tmp_path):
+    index = modes.pep_index(pages_session)
+    selected = [
+        set(shards.select(index, lambda row: row[0], (number, SHARDS)))
+        for number in range(1, SHARDS + 1)
+    ]
+    assert set().union(*selected) == set(range(len(index)))
+    assert sum(map(len, selected)) == len(index), (
+        'Каждая строка индекса должна попадать ровно в одну часть'
+    )
+
+
+def test_merge_missing_shard(pages_session, tmp_path):
+    run_shards(pages_session, 'pep', tmp_path)
+    (tmp_path / 'pep_2-of-3.json').unlink()
+    with pytest.raises(ValueError):
+        shards.load(Namespace(shard_dir=tmp_path), 'pep')
@@ -0,0 +1,40 @@
+import pytest
+from requests import ConnectionError
+try:
+    from src import configs, main, utils
+except ModuleNotFoundError:
+    assert False, 'Убедитесь что в директории `src` есть файл `snapshots.py`'
+except ImportError:
+    assert False, 'Убедитесь что в директории `src` есть файл `snapshots.py`'
+
+from conftest import MAIN_PEP_URL
+
+
+def pep_args(*args):
+    return configs.configure_argument_parser(['pep']).parse_args(
+        ['pep', '--cache-backend', 'memory', *args]
+    )
+
+
+def test_record_and_replay(pages_session, tmp_path):
+    args = pep_args()
+    with utils.snapshots.recording(tmp_path):
+        expected = list(main.pep(pages_session, args))
+    size = (tmp_path / 'pages.bin').stat().st_size
+    with utils.snapshots.recording(tmp_path):
+        list(main.pep(pages_session, args))
+    assert (tmp_path / 'pages.bin').stat().st_size == size, (
+        'Повторная запись тех же страниц не должна увеличивать снимок'
+    )
+    session = configs.configure_session(pep_args('--replay', str(tmp_path)))
+    assert list(main.pep(session, args)) == expected, (
+        'Режим replay должен давать те же результаты, что и запись'
+    )
+    with pytest.raises(ConnectionError):
+        utils.get_response(session, f'{MAIN_PEP_URL}missing/')
+    session.close()
+
+
+def test_replay_without_snapshot(tmp_path):
+    with pytest.raises(FileNotFoundError):
+        configs.configure_session(pep_args('--replay', str(tmp_path)))
@@ -2,6 +2,8 @@ import pytest
 import requests
 import requests_mock
 import bs4
+from argparse import Namespace
+from requests_cache import CachedSession
 from conftest import MAIN_DOC_URL
 try:
     from src import utils
@@ -54,3 +56,254 @@ def test_get_response(mock_session):
             'делает запрос к странице и возвращает ответ. \n'
             'Кстати: You are breathtaken!'
         )
+
+
+@pytest.mark.parametrize('workers', [1, 4])
+def test_crawl(pages_session, workers):
+    urls = [
+        f'https://peps.python.org/pep-{number:04d}/'
+        for number in (1, 8, 20, 202, 205, 211)
+    ] + ['mock://pages/missing']
+    got = list(utils.crawl(
+        pages_session, urls, 'pep_status', Namespace(workers=workers)
+    ))
+    assert got[:-1] == [
+        ('Active', None), ('Active', None), ('Active', None),
+        ('Final', None), ('Final', None), ('Rejected', None),
+    ], (
+        'Функция `crawl` в модуле `utils.py` должна возвращать результаты '
+        'в порядке переданных ссылок независимо от числа потоков'
+    )
+    record, error = got[-1]
+    assert record is None and isinstance(error, requests.ConnectionError)
+
+
+ARCHIVE = bytes(range(256)) * 1000
+ARCHIVE_ETAG = '"archive-v2"'
+
+
+def ranged_archive(request, context):
+    context.headers['ETag'] = ARCHIVE_ETAG
+    range_header = request.headers.get('Range')
+    if range_header is None or request.headers.get('If-Range') not in (
+        None, ARCHIVE_ETAG
+    ):
+        return ARCHIVE
+    start, end = range_header.split('=')[1].split('-')
+    if int(start) >= len(ARCHIVE):
+        context.status_code = 416
+        context.headers['Content-Range'] = f'bytes */{len(ARCHIVE)}'
+        return b''
+    end = int(end) if end else len(ARCHIVE) - 1
+    context.status_code = 206
+    context.headers['Content-Range'] = f'bytes {start}-{end}/{len(ARCHIVE)}'
+    return ARCHIVE[int(start):end + 1]
+
+
+@pytest.mark.parametrize('downloaded', [0, 1000, len(ARCHIVE) // 2])
+def test_stream_download(mock_session, tmp_path, downloaded):
+    url = 'mock://docs/archive.zip'
+    mock_session.mock_adapter.register_uri(
+        'GET', url, content=ranged_archive
+    )
+    archive_path = tmp_path / 'archive.zip'
+    part_path = tmp_path / 'archive.zip.part'
+    if downloaded:
+        part_path.write_bytes(ARCHIVE[:downloaded])
+        (tmp_path / 'archive.zip.validator').write_text(ARCHIVE_ETAG)
+    got = utils.stream_download(mock_session, url, archive_path, 4096)
+    assert got == archive_path and archive_path.read_bytes() == ARCHIVE, (
+        'Функция `stream_download` должна докачивать архив целиком'
+    )
+    assert not part_path.exists(), (
+        'После загрузки временный файл `.part` должен быть переименован'
+    )
+    history = mock_session.mock_adapter.request_history
+    assert len(history) == 1 and (
+        history[0].headers.get('If-Range') == (
+            ARCHIVE_ETAG if downloaded else None
+        )
+    ), 'Докачка должна проверять версию архива заголовком If-Range'
+    assert not mock_session.cache.contains(url=url), (
+        'Архивы не должны сохраняться в кеш запросов'
+    )
+
+
+@pytest.mark.parametrize('part, validator', [
+    (b'stale' * 1000, '"archive-v1"'),
+    (ARCHIVE + b'extra', ARCHIVE_ETAG),
+    (ARCHIVE[:1000], None),
+])
+def test_stream_download_restarts(mock_session, tmp_path, part, validator):
+    url = 'mock://docs/archive.zip'
+    mock_session.mock_adapter.register_uri(
+        'GET', url, content=ranged_archive
+    )
+    archive_path = tmp_path / 'archive.zip'
+    (tmp_path / 'archive.zip.part').write_bytes(part)
+    if validator is not None:
+        (tmp_path / 'archive.zip.validator').write_text(validator)
+    utils.stream_download(mock_session, url, archive_path, 4096)
+    assert archive_path.read_bytes() == ARCHIVE, (
+        'Если архив изменился или размер `.part` не совпадает с архивом, '
+        'загрузка должна начинаться заново'
+    )
+    assert not (tmp_path / 'archive.zip.validator').exists()
+
+
+def test_stream_download_complete_part(mock_session, tmp_path):
+    url = 'mock://docs/archive.zip'
+    mock_session.mock_adapter.register_uri(
+        'GET', url, content=ranged_archive
+    )
+    archive_path = tmp_path / 'archive.zip'
+    (tmp_path / 'archive.zip.part').write_bytes(ARCHIVE)
+    (tmp_path / 'archive.zip.validator').write_text(ARCHIVE_ETAG)
+    utils.stream_download(mock_session, url, archive_path, 4096)
+    assert archive_path.read_bytes() == ARCHIVE
+    assert mock_session.mock_adapter.call_count == 1, (
+        'Полностью загруженный `.part` не должен скачиваться заново'
+    )
+
+
+@pytest.mark.parametrize('accept_ranges, segments', [
+    ('bytes', 4), ('bytes', 7), ('none', 4), ('bytes', 1)
+])
+def test_segmented_download(mock_session, tmp_path, accept_ranges, segments):
+    url = 'mock://docs/archive.zip'
+    mock_session.mock_adapter.register_uri(
+        'HEAD', url, headers={
+            'Accept-Ranges': accept_ranges,
+            'Content-Length': str(len(ARCHIVE))
+        }
+    )
+    mock_session.mock_adapter.register_uri(
+        'GET', url, content=ranged_archive
+    )
+    archive_path = tmp_path / 'archive.zip'
+    utils.segmented_download(mock_session, url, archive_path, segments)
+    assert archive_path.read_bytes() == ARCHIVE, (
+        'Функция `segmented_download` должна собирать архив из частей '
+        'или скачивать его одним потоком, если сервер не поддерживает Range'
+    )
+    ranged = [
+        request for request in mock_session.mock_adapter.request_history
+        if request.method == 'GET' and 'Range' in request.headers
+    ]
+    expected = segments if accept_ranges == 'bytes' and segments > 1 else 0
+    assert len(ranged) == expected, (
+        'Количество запросов частей архива должно совпадать '
+        'с параметром `segments`'
+    )
+
+
+def test_segmented_download_range_ignored(mock_session, tmp_path):
+    url = 'mock://docs/archive.zip'
+    mock_session.mock_adapter.register_uri(
+        'HEAD', url, headers={
+            'Accept-Ranges': 'bytes',
+            'Content-Length': str(len(ARCHIVE))
+        }
+    )
+    mock_session.mock_adapter.register_uri('GET', url, content=ARCHIVE)
+    archive_path = tmp_path / 'archive.zip'
+    utils.segmented_download(mock_session, url, archive_path, 4)
+    assert archive_path.read_bytes() == ARCHIVE, (
+        'Если сервер отвечает на запрос части целым архивом, '
+        'архив должен скачиваться заново одним потоком'
+    )
+    assert not (tmp_path / 'archive.zip.part').exists()
+
+
+def test_get_soup_scope(pages_session):
+    url = 'https://peps.python.org/pep-0008/'
+    full = utils.get_soup(pages_session, url)
+    scoped = utils.get_soup(
+        pages_session, url,
+        scope=('dl', {'class': 'rfc2822 field-list simple'})
+    )
+    assert [tag.name for tag in scoped.find_all(True)][0] == 'dl', (
+        'Функция `get_soup` с параметром `scope` должна строить '
+        'только нужное поддерево страницы'
+    )
+    assert len(scoped.find_all(True)) < len(full.find_all(True))
+    assert str(scoped.dl) == str(full.find(
+        'dl', attrs={'class': 'rfc2822 field-list simple'}
+    ))
+
+
+def etag_page(request, context):
+    context.headers['ETag'] = '"v1"'
+    if request.headers.get('If-None-Match') == '"v1"':
+        context.status_code = 304
+        return b''
+    return b'<html><h1>PEP</h1></html>'
+
+
+def test_get_response_cache_stats(monkeypatch):
+    monkeypatch.setattr(utils, 'CACHE_STATS', utils.Counter())
+    session = CachedSession(backend='memory', expire_after=0)
+    adapter = requests_mock.Adapter()
+    adapter.register_uri('GET', 'mock://peps/pep-0008/', content=etag_page)
+    session.mount('mock://', adapter)
+    for _ in range(3):
+        got = utils.get_response(session, 'mock://peps/pep-0008/')
+    assert got.content == b'<html><h1>PEP</h1></html>'
+    assert adapter.last_request.headers['If-None-Match'] == '"v1"', (
+        'Устаревшие страницы должны перепроверяться условным запросом'
+    )
+    assert utils.CACHE_STATS == {'misses': 1, 'revalidations': 2}, (
+        'Функция `get_response` должна подсчитывать попадания, промахи '
+        'и перепроверки кеша'
+    )
+
+
+def test_shared_pages(pages_session):
+    adapter = pages_session.mock_adapter
+    with pages_session.cache_disabled():
+        with utils.shared_pages():
+            calls = adapter.call_count
+            full = utils.get_document(pages_session, MAIN_DOC_URL)
+            scoped = utils.get_document(
+                pages_session, MAIN_DOC_URL, scope=('div', None)
+            )
+            lxml = utils.get_document(
+                pages_session, MAIN_DOC_URL, Namespace(backend='lxml')
+            )
+            assert adapter.call_count == calls + 1, (
+                'Внутри общего запуска режимов загруженная страница '
+                'должна использоваться повторно для любых областей и библиотек'
+            )
+        assert full is not scoped and lxml is not None
+        utils.get_document(pages_session, MAIN_DOC_URL)
+        assert adapter.call_count == calls + 2, (
+            'После запуска режимов загруженные страницы не должны храниться'
+        )
+
+
+def test_stream_prefix(pages_session):
+    url = 'https://peps.python.org/pep-0008/'
+    scope = ('dl', {'class': 'rfc2822 field-list simple'})
+    prefix, encoding = utils.stream_prefix(
+        pages_session, url, scope, chunk_size=64
+    )
+    assert not utils.is_cached(pages_session, url), (
+        'Неполная страница не должна сохраняться в кеш'
+    )
+    page = pages_session.get(url).content
+    assert len(prefix) < len(page) and b'</dl>' in prefix, (
+        'Загрузка карточки должна останавливаться после списка полей'
+    )
+    calls = pages_session.mock_adapter.call_count
+    cached_prefix, _ = utils.stream_prefix(
+        pages_session, url, scope, chunk_size=64
+    )
+    assert pages_session.mock_adapter.call_count == calls, (
+        'Страница из кеша не должна загружаться заново'
+    )
+    assert cached_prefix == prefix
+    assert utils.get_backend().pep_status(
+        utils.parse_content(prefix, encoding, scope=scope)
+    ) == utils.get_backend().pep_status(
+        utils.parse_content(page, encoding, scope=scope)
+    )